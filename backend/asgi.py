@@ -0,0 +1,233 @@
+"""
+ASGI serving mode: the same routes as main.py's Flask app, served by
+Starlette under uvicorn with one long-lived event loop per worker process.
+
+Under the Flask development server every request to the async /convert
+view gets a fresh event loop, and /convert_async jobs run on their job
+worker's own loop. Here conversions, their engine requests and queued
+jobs all run as tasks on the server's loop; CPU-bound assembly and
+encoding go to threads so the loop stays responsive.
+
+Jobs, progress and caches live in this process, so run a single worker.
+
+Usage: python backend/asgi.py
+   or: uvicorn asgi:app --app-dir backend --port 5000
+"""
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.datastructures import UploadFile
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import main
+import parler_registry
+from encoder import OUTPUT_FORMATS, STREAMABLE_FORMATS
+
+# Largest non-file form field accepted, i.e. text pasted into the form
+MAX_FORM_TEXT_BYTES = 64 * 1024 * 1024
+
+NO_CACHE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+
+def _error(message, status=400):
+    return JSONResponse({'error': message}, status_code=status)
+
+
+async def _request_values(request):
+    """Query and form fields (query first, like Flask's request.values) and the upload, if any"""
+    values = dict(request.query_params)
+    upload = None
+    if request.method == 'POST':
+        form = await request.form(max_files=1, max_part_size=MAX_FORM_TEXT_BYTES)
+        for name, value in form.multi_items():
+            if isinstance(value, UploadFile):
+                if name == 'file':
+                    upload = (value.filename, value.file)
+            else:
+                values.setdefault(name, value)
+    return values, upload
+
+
+def _if_none_match(request):
+    """Entity tags of If-None-Match without quotes; weak tags match too, as for GET"""
+    header = request.headers.get('if-none-match', '')
+    return {tag.strip().removeprefix('W/').strip('"') for tag in header.split(',') if tag.strip()}
+
+
+def _not_modified(etag):
+    return Response(status_code=304, headers={'ETag': f'"{etag}"'})
+
+
+def _audio_response(path, output_format, etag=None, background=None):
+    """Encoded result as an attachment; FileResponse answers Range requests itself"""
+    spec = OUTPUT_FORMATS[output_format]
+    return FileResponse(
+        path,
+        media_type=spec['mimetype'],
+        filename=f"mixed_tts_output.{spec['extension']}",
+        headers={'ETag': f'"{etag}"'} if etag else None,
+        background=background,
+    )
+
+
+async def _read_request(request, allowed=tuple(OUTPUT_FORMATS)):
+    """Return (source, format, None) for a conversion request, or (None, None, error_response)"""
+    values, upload = await _request_values(request)
+    output_format, error = main.parse_output_format(values.get('format'), allowed)
+    if error:
+        return None, None, _error(error)
+    # Saving the upload and checking it for text is file I/O
+    source, error = await asyncio.to_thread(main.parse_source, values.get('text'), upload)
+    if error:
+        return None, None, _error(error)
+    return source, output_format, None
+
+
+async def convert_text_to_speech(request):
+    """Main endpoint for text-to-speech conversion"""
+    source = None
+    try:
+        source, output_format, error = await _read_request(request)
+        if error:
+            return error
+        path, output_format, key, temporary = await main.convert_document(
+            source, output_format, _if_none_match(request))
+        if path is None:
+            return _not_modified(key)
+        background = BackgroundTask(main._remove_file, path) if temporary else None
+        return _audio_response(path, output_format, key, background)
+    except Exception as e:
+        print(f"Error in conversion: {str(e)}")
+        return _error(f'Conversion failed: {str(e)}', 500)
+    finally:
+        if source:
+            source.discard()
+
+
+async def convert_text_to_speech_async(request):
+    """Start an async conversion job and return a job_id for progress polling."""
+    try:
+        source, output_format, error = await _read_request(request)
+        if error:
+            return error
+        body, status, headers = await asyncio.to_thread(main.submit_conversion, source, output_format)
+        return JSONResponse(body, status_code=status, headers=headers)
+    except Exception as e:
+        print(f"Error starting async conversion: {e}")
+        return _error(f'Failed to start conversion: {str(e)}', 500)
+
+
+async def convert_text_to_speech_stream(request):
+    """Stream MP3 (or raw PCM) audio segment by segment using chunked transfer"""
+    try:
+        source, output_format, error = await _read_request(request, STREAMABLE_FORMATS)
+        if error:
+            return error
+        return StreamingResponse(
+            main.astream_text_to_speech(source, output_format),
+            media_type=OUTPUT_FORMATS[output_format]['mimetype'],
+            headers=NO_CACHE_HEADERS,
+        )
+    except Exception as e:
+        print(f"Error starting streaming conversion: {e}")
+        return _error(f'Conversion failed: {str(e)}', 500)
+
+
+async def get_progress(request):
+    job_id = request.path_params['job_id']
+    job = main.JOBS.get(job_id)
+    if not job:
+        return _error('Job not found', 404)
+    return JSONResponse(main._job_snapshot(job_id, job))
+
+
+async def get_progress_events(request):
+    """Push progress updates for a job as Server-Sent Events"""
+    job_id = request.path_params['job_id']
+    if job_id not in main.JOBS:
+        return _error('Job not found', 404)
+    # Subscribe before reading the current state so no update is missed in between
+    updates = main.PROGRESS_EVENTS.subscribe_async(job_id)
+    return StreamingResponse(
+        main._aprogress_event_stream(job_id, updates),
+        media_type='text/event-stream',
+        headers=NO_CACHE_HEADERS,
+    )
+
+
+async def download_result(request):
+    """Finished job output, or a cached result by the key /convert_async returned"""
+    target, error = main.download_target(request.path_params['job_id'])
+    if error:
+        return _error(*error)
+    path, output_format, etag = target
+    if etag and etag in _if_none_match(request):
+        return _not_modified(etag)
+    if not os.path.exists(path):
+        # Evicted from the result cache since the lookup
+        return _error('Job not found', 404)
+    return _audio_response(path, output_format, etag)
+
+
+async def get_manifest(request):
+    """Paragraph index of a finished job or cached result: content hashes and time offsets"""
+    path, error = main.manifest_target(request.path_params['job_id'])
+    if error:
+        return _error(*error)
+    if not os.path.exists(path):
+        return _error('Manifest not available', 404)
+    return FileResponse(path, media_type='application/json')
+
+
+async def metrics_endpoint(request):
+    """Stage timing histograms and service counters in Prometheus text format"""
+    return PlainTextResponse(main.metrics_text(), media_type='text/plain; version=0.0.4')
+
+
+async def health_check(request):
+    """Health check endpoint with TTS engine status"""
+    return JSONResponse(main.health_status())
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Queued jobs run on this loop from now on; the job workers only bound how many run at once
+    main.JOB_QUEUE.attach_loop(asyncio.get_running_loop())
+    if main.TTS_CONFIG['preferred_engine'] in ['hf-tts', 'auto']:
+        # Load and warm the Parler model before the first request needs it
+        threading.Thread(target=parler_registry.get_model, daemon=True).start()
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route('/convert', convert_text_to_speech, methods=['GET', 'POST']),
+        Route('/convert_async', convert_text_to_speech_async, methods=['POST']),
+        Route('/convert_stream', convert_text_to_speech_stream, methods=['GET', 'POST']),
+        Route('/progress/{job_id}', get_progress, methods=['GET']),
+        Route('/progress/{job_id}/events', get_progress_events, methods=['GET']),
+        Route('/download/{job_id}', download_result, methods=['GET']),
+        Route('/manifest/{job_id}', get_manifest, methods=['GET']),
+        Route('/metrics', metrics_endpoint, methods=['GET']),
+        Route('/health', health_check, methods=['GET']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan,
+)
+
+
+if __name__ == '__main__':
+    print("\n" + "="*60)
+    print("🎤 Mixed Text-to-Speech Converter - ASGI mode")
+    print("="*60)
+    print(f"Preferred Engine: {main.TTS_CONFIG['preferred_engine']}")
+    print("="*60 + "\n")
+    uvicorn.run(app, host='127.0.0.1', port=5000, workers=1)
@@ -0,0 +1,118 @@
+import io
+
+import numpy as np
+import soundfile as sf
+from pydub import AudioSegment
+
+# Every segment is converted to this layout before assembly
+CANONICAL_RATE = 24000
+CANONICAL_CHANNELS = 1
+
+_SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def resample(samples, src_rate, dst_rate):
+    """Linearly resample a mono float32 array"""
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples
+    n_out = int(round(len(samples) * dst_rate / src_rate))
+    positions = np.arange(n_out, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def decode(data, fmt=None):
+    """Decode encoded audio bytes in-process to ``(samples, sample_rate)``.
+
+    libsndfile reads WAV, OGG and (from 1.1) MP3 without a subprocess;
+    anything it cannot read goes through pydub/ffmpeg as before.
+    """
+    try:
+        return sf.read(io.BytesIO(data), dtype='float32')
+    except (sf.LibsndfileError, RuntimeError):
+        return AudioSegment.from_file(io.BytesIO(data), format=fmt)
+
+
+def decode_pcm(data):
+    """Decode headerless 16-bit little-endian mono PCM to float32 samples"""
+    return np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def to_canonical(audio, rate=CANONICAL_RATE):
+    """Decode an AudioSegment or ``(samples, sample_rate)`` pair to mono float32 at ``rate``"""
+    if isinstance(audio, AudioSegment):
+        dtype = _SAMPLE_DTYPES[audio.sample_width]
+        samples = np.frombuffer(audio.raw_data, dtype=dtype).astype(np.float32)
+        samples /= float(2 ** (8 * audio.sample_width - 1))
+        if audio.channels > 1:
+            samples = samples.reshape(-1, audio.channels).mean(axis=1)
+        src_rate = audio.frame_rate
+    else:
+        samples, src_rate = audio
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+    return resample(samples, src_rate, rate)
+
+
+def assemble(clips, gaps_ms, crossfade_ms=0, rate=CANONICAL_RATE):
+    """Join canonical clips into one preallocated buffer.
+
+    ``gaps_ms[i]`` is the silence inserted before ``clips[i + 1]``. Joins
+    without a gap are crossfaded over ``crossfade_ms`` (clamped to the
+    shorter neighbour), so the total work is linear in the output length.
+    """
+    if not clips:
+        return np.zeros(0, dtype=np.float32)
+    gap_samples = [int(rate * g / 1000) for g in gaps_ms]
+    xf = int(rate * crossfade_ms / 1000)
+
+    overlaps = []
+    for i in range(1, len(clips)):
+        if gap_samples[i - 1] or not xf:
+            overlaps.append(0)
+        else:
+            overlaps.append(min(xf, len(clips[i - 1]), len(clips[i])))
+
+    total = sum(len(c) for c in clips) + sum(gap_samples) - sum(overlaps)
+    out = np.zeros(total, dtype=np.float32)
+
+    pos = len(clips[0])
+    out[:pos] = clips[0]
+    for i in range(1, len(clips)):
+        clip = clips[i]
+        pos += gap_samples[i - 1]  # buffer is already zero-filled
+        ov = overlaps[i - 1]
+        if ov:
+            ramp = np.linspace(0.0, 1.0, ov, dtype=np.float32)
+            out[pos - ov:pos] = out[pos - ov:pos] * (1.0 - ramp) + clip[:ov] * ramp
+        out[pos:pos + len(clip) - ov] = clip[ov:]
+        pos += len(clip) - ov
+    return out
+
+
+def to_audio_segment(samples, rate=CANONICAL_RATE):
+    """Convert a float32 buffer to a 16-bit mono AudioSegment"""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    return AudioSegment(pcm.tobytes(), sample_width=2, frame_rate=rate, channels=CANONICAL_CHANNELS)
+
+
+def _speedup_window_ms(playback_speed, chunk_ms):
+    """Length of one kept chunk plus the slice pydub's speedup cuts after it"""
+    keep = 1.0 / playback_speed
+    if playback_speed < 2.0:
+        return chunk_ms + int(chunk_ms * (1 - keep) / keep)
+    return chunk_ms + int(keep * chunk_ms / (1 - keep))
+
+
+def speed_up(samples, rate=CANONICAL_RATE, playback_speed=1.25, chunk_ms=150, crossfade_ms=25):
+    """Speed a float32 buffer up by ``playback_speed`` without changing pitch.
+
+    pydub cuts between windows of audio and refuses clips no longer than
+    one window (about 0.2 s at 1.25x), such as a one-word paragraph; those
+    are returned unchanged.
+    """
+    segment = to_audio_segment(samples, rate)
+    if len(segment) <= _speedup_window_ms(playback_speed, chunk_ms):
+        return samples
+    faster = segment.speedup(playback_speed=playback_speed, chunk_size=chunk_ms, crossfade=crossfade_ms)
+    return to_canonical(faster, rate)
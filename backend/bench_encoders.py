@@ -0,0 +1,60 @@
+"""
+Benchmark final-output encoding: encode time and size per output format.
+
+Encodes the same speech clip with each format in encoder.OUTPUT_FORMATS
+(in-process libsndfile) and with pydub/ffmpeg MP3 exports, which start
+one ffmpeg process per call: 192 kbps as before, and 64 kbps to compare
+like with like.
+
+Usage: python backend/bench_encoders.py [audio file] [repeats]
+"""
+import io
+import os
+import statistics
+import sys
+import time
+
+import soundfile as sf
+
+from assembly import CANONICAL_RATE, to_audio_segment, to_canonical
+from encoder import OUTPUT_FORMATS, encode
+
+DEFAULT_AUDIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'mac audio', '1.mp3')
+
+
+def ffmpeg_export(samples, rate, bitrate):
+    buf = io.BytesIO()
+    to_audio_segment(samples, rate).export(buf, format="mp3", bitrate=bitrate)
+    return buf.getvalue()
+
+
+def timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        data = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), data
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_AUDIO
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    samples = to_canonical(sf.read(path, dtype='float32'), CANONICAL_RATE)
+    seconds = len(samples) / CANONICAL_RATE
+    print(f"{os.path.basename(path)}: {seconds:.1f}s of audio at {CANONICAL_RATE} Hz, median of {repeats}")
+    print(f"{'format':>15} {'encode ms':>10} {'x realtime':>11} {'bytes':>10} {'kbps':>7}")
+
+    cases = [
+        ('ffmpeg mp3 192k', lambda: ffmpeg_export(samples, CANONICAL_RATE, '192k')),
+        ('ffmpeg mp3 64k', lambda: ffmpeg_export(samples, CANONICAL_RATE, '64k')),
+    ]
+    cases += [(fmt, lambda fmt=fmt: encode(samples, CANONICAL_RATE, fmt)) for fmt in OUTPUT_FORMATS]
+    for name, fn in cases:
+        elapsed, data = timed(fn, repeats)
+        print(f"{name:>15} {elapsed * 1000:>10.1f} {seconds / elapsed:>11.0f} {len(data):>10} "
+              f"{len(data) * 8 / seconds / 1000:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
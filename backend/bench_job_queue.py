@@ -0,0 +1,55 @@
+"""
+Benchmark the background job queue under overload.
+
+Offers jobs faster than the workers can finish them and reports completed
+jobs/sec, rejections and the threads added. Throughput should hold at roughly
+workers / job_seconds however hard the queue is pushed, with the excess
+turned away instead of piling up threads.
+
+Usage: python backend/bench_job_queue.py [workers] [queue depth] [job seconds]
+"""
+import asyncio
+import sys
+import threading
+import time
+
+from job_queue import JobQueue, QueueFull
+
+
+async def fake_job(seconds):
+    await asyncio.sleep(seconds)
+
+
+def run(queue, offered_per_sec, duration, job_seconds):
+    accepted = rejected = 0
+    completed_before = queue.stats()['completed']
+    start = time.perf_counter()
+    peak_threads = threading.active_count()
+    while time.perf_counter() - start < duration:
+        try:
+            queue.submit(f'job-{accepted + rejected}', fake_job, job_seconds)
+            accepted += 1
+        except QueueFull:
+            rejected += 1
+        peak_threads = max(peak_threads, threading.active_count())
+        time.sleep(1 / offered_per_sec)
+    completed = queue.stats()['completed'] - completed_before
+    return completed / duration, accepted, rejected, peak_threads
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    job_seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+    capacity = workers / job_seconds
+    print(f"{workers} workers, depth {depth}, {job_seconds}s jobs, capacity {capacity:.1f} jobs/s")
+    print(f"{'offered/s':>9} {'done/s':>7} {'accepted':>9} {'rejected':>9} {'threads':>8}")
+    for load in (0.5, 1, 2, 5, 10):
+        baseline = threading.active_count()
+        queue = JobQueue(workers=workers, max_depth=depth, initial_job_seconds=job_seconds)
+        done, accepted, rejected, threads = run(queue, capacity * load, 5.0, job_seconds)
+        print(f"{capacity * load:>9.1f} {done:>7.2f} {accepted:>9} {rejected:>9} {threads - baseline:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark batched Parler-TTS generation: utterances/sec against batch size.
+
+Prompts are sentences taken from TaEN_con.csv so lengths are realistic.
+Run on the target host (CPU by default when no GPU is present).
+
+Usage: python backend/bench_parler_batch.py [num_prompts] [batch sizes, e.g. 1,2,4,8]
+"""
+import csv
+import os
+import re
+import sys
+import time
+
+from parler_registry import get_model
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'TaEN_con.csv')
+
+
+def load_prompts(n, csv_path=DEFAULT_CSV):
+    prompts = []
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            prompts.extend(s.strip() for s in re.split(r'(?<=[.!?])\s+', row['conversation_text']) if s.strip())
+            if len(prompts) >= n:
+                break
+    return prompts[:n]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    batch_sizes = [int(b) for b in sys.argv[2].split(',')] if len(sys.argv) > 2 else [1, 2, 4, 8]
+    prompts = load_prompts(n)
+
+    model = get_model()
+    print(f"Model on {model.device}: load {model.load_seconds:.1f}s, warmup {model.warmup_seconds:.1f}s")
+    print(f"{len(prompts)} prompts, mean {sum(map(len, prompts)) / len(prompts):.0f} chars")
+    print(f"{'batch':>5} {'seconds':>9} {'utt/s':>7} {'audio s/s':>10}")
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        audio_arrs, sampling_rate = model.generate_batch(prompts, max_batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        audio_seconds = sum(len(a) for a in audio_arrs) / sampling_rate
+        print(f"{batch_size:>5} {elapsed:>9.2f} {len(prompts) / elapsed:>7.2f} {audio_seconds / elapsed:>10.2f}")
+
+    stats = model.stats()
+    print(f"Description cache: {stats['description_cache']}")
+    print(f"Seconds per stage: {stats['stage_seconds']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark Parler-TTS CPU inference profiles: real-time factor and peak RSS.
+
+Each profile runs in a fresh subprocess so load time and peak memory are
+measured in isolation. RTF is synthesis seconds per second of audio (lower
+is better, below 1.0 is faster than real time).
+
+Usage: python backend/bench_parler_profiles.py [num_prompts] [profiles, e.g. fp32,int8,bf16] [threads]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from bench_parler_batch import load_prompts
+
+
+def run_profile(profile, n, threads):
+    """Run in the child process; prints one JSON line of results"""
+    from parler_registry import ParlerModel
+
+    prompts = load_prompts(n)
+    model = ParlerModel(profile=profile, threads=threads)
+    model.warmup()
+
+    start = time.perf_counter()
+    audio_seconds = 0.0
+    for prompt in prompts:
+        audio_arr, sampling_rate = model.generate(prompt)
+        audio_seconds += len(audio_arr) / sampling_rate
+    elapsed = time.perf_counter() - start
+
+    stats = model.stats()
+    print(json.dumps({
+        'profile': stats['profile'],
+        'threads': stats['threads'],
+        'load_s': round(model.load_seconds, 2),
+        'synth_s': round(elapsed, 2),
+        'audio_s': round(audio_seconds, 2),
+        'rtf': round(elapsed / max(audio_seconds, 1e-9), 3),
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--run':
+        run_profile(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+        return
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    profiles = sys.argv[2].split(',') if len(sys.argv) > 2 else ['default', 'fp32', 'int8', 'bf16']
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+
+    print(f"{n} prompts, {threads} threads")
+    print(f"{'requested':>9} {'profile':>8} {'load s':>7} {'synth s':>8} {'audio s':>8} {'RTF':>6} {'peak RSS MB':>12}")
+    for profile in profiles:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run', profile, str(n), str(threads)],
+            capture_output=True, text=True,
+        )
+        lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+        if proc.returncode != 0 or not lines:
+            print(f"{profile:>9} failed: {proc.stderr.strip().splitlines()[-1:] or proc.returncode}")
+            continue
+        r = json.loads(lines[-1])
+        # 'profile' can differ from the requested one when bf16 is unsupported
+        print(f"{profile:>9} {r['profile']:>8} {r['load_s']:>7.1f} {r['synth_s']:>8.2f} "
+              f"{r['audio_s']:>8.2f} {r['rtf']:>6.3f} {r['peak_rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Deterministic microbenchmarks for each stage of the TTS pipeline over the
+rows of TaEN_con.csv: split_mixed_text, synthesis fan-out, segment
+assembly, the 1.25x speedup pass and the final export.
+
+Engines are replaced by fake_engine, which renders deterministic audio of
+realistic length locally (optionally after a fixed simulated round trip),
+so runs are repeatable and need no network. Each stage reports the median
+and minimum of several repeats. Every run is appended as one JSON line to
+a results file together with the git commit, and compared with the last
+run recorded for a different commit, so regressions show up between
+commits.
+
+Usage: python backend/bench_pipeline.py [--csv TaEN_con.csv] [--rows N] [--repeats 5]
+           [--latency 0.02] [--results bench_results/pipeline.jsonl]
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+import numpy as np
+
+import fake_engine
+import segmenter
+from assembly import CANONICAL_RATE, assemble, speed_up, to_canonical
+from encoder import encode
+from engines import BlockingEngine, EngineRegistry, builtin_capabilities
+from planner import DEFAULT_POLICY, plan_segments
+from segmenter import split_mixed_text
+from synthesis import SynthesisPool
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV = os.path.join(HERE, '..', 'TaEN_con.csv')
+DEFAULT_RESULTS = os.path.join(HERE, '..', 'bench_results', 'pipeline.jsonl')
+
+# Same values the server uses by default
+PLAYBACK_SPEED = 1.25
+SWITCH_GAP_MS = 5
+GTTS_CONCURRENCY = 8
+
+
+def load_rows(csv_path, limit=None):
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = [row['conversation_text'] for row in csv.DictReader(f)]
+    return rows[:limit] if limit else rows
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                             capture_output=True, text=True, check=True)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=HERE,
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def measure(fn, repeats):
+    """Run ``fn`` ``repeats`` times; return (median, min, last result)"""
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), min(times), result
+
+
+def segment_rows(rows):
+    # Cold caches on every repeat so each run does the same work
+    segmenter.classify_word.cache_clear()
+    return [split_mixed_text(text) for text in rows]
+
+
+def plan_rows(segmented, max_chars):
+    return [plan_segments(segments, DEFAULT_POLICY, max_chars)[0] for segments in segmented]
+
+
+def synthesize_rows(pool, planned, latency):
+    """Fan every row's segments out to the fake engine through the synthesis pool"""
+    async def render(segments):
+        return await asyncio.gather(*[
+            pool.run('gtts', fake_engine.synthesize, text, lang, latency) for text, lang in segments
+        ])
+    return [asyncio.run(render(segments)) for segments in planned]
+
+
+def _gaps(segments):
+    return [SWITCH_GAP_MS if segments[i - 1][1] != segments[i][1] else 0 for i in range(1, len(segments))]
+
+
+def assemble_rows(planned, synthesized):
+    return [
+        assemble([to_canonical(audio, CANONICAL_RATE) for audio in audios], _gaps(segments), 0, CANONICAL_RATE)
+        for segments, audios in zip(planned, synthesized)
+    ]
+
+
+def speed_up_rows(assembled):
+    return [speed_up(samples, CANONICAL_RATE, PLAYBACK_SPEED) for samples in assembled]
+
+
+def export_rows(faster, fmt):
+    return [encode(samples, CANONICAL_RATE, fmt) for samples in faster]
+
+
+def run(args):
+    rows = load_rows(args.csv, args.rows)
+    chars = sum(len(text) for text in rows)
+    pool = SynthesisPool(max_workers=32, limits={})
+    # The fake engine stands in for gTTS, with gTTS's declared limits
+    engines = EngineRegistry()
+    engines.register(BlockingEngine('gtts', builtin_capabilities('gtts', GTTS_CONCURRENCY), pool,
+                                    fake_engine.synthesize))
+    max_chars = engines.max_request_chars(['gtts'])
+
+    stages = {}
+
+    def record(name, fn, units, unit_name):
+        median, best, result = measure(fn, args.repeats)
+        stages[name] = {
+            'median_s': round(median, 6),
+            'min_s': round(best, 6),
+            'units': units,
+            f'{unit_name}_per_s': round(units / median, 1) if median else 0.0,
+        }
+        return result
+
+    segmented = record('split_mixed_text', lambda: segment_rows(rows), chars, 'chars')
+    planned = record('plan_segments', lambda: plan_rows(segmented, max_chars), sum(map(len, segmented)), 'segments')
+    requests = sum(map(len, planned))
+    synthesized = record('synthesis_fanout', lambda: synthesize_rows(pool, planned, args.latency),
+                         requests, 'requests')
+    assembled = record('assemble', lambda: assemble_rows(planned, synthesized), requests, 'segments')
+    audio_seconds = sum(len(samples) for samples in assembled) / CANONICAL_RATE
+    faster = record('speedup', lambda: speed_up_rows(assembled), round(audio_seconds, 3), 'audio_seconds')
+    output_seconds = sum(len(samples) for samples in faster) / CANONICAL_RATE
+    encoded = record(f'export_{args.format}', lambda: export_rows(faster, args.format),
+                     round(output_seconds, 3), 'audio_seconds')
+
+    # Checksums show whether a change altered the output, not just its speed
+    digest = np.concatenate(faster).astype(np.float64).sum() if faster else 0.0
+    return {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'config': {
+            'csv': os.path.basename(args.csv),
+            'rows': len(rows),
+            'repeats': args.repeats,
+            'latency_s': args.latency,
+            'format': args.format,
+            'playback_speed': PLAYBACK_SPEED,
+        },
+        'totals': {
+            'chars': chars,
+            'requests': requests,
+            'audio_seconds': round(audio_seconds, 3),
+            'output_seconds': round(output_seconds, 3),
+            'output_bytes': sum(map(len, encoded)),
+            'output_checksum': round(float(digest), 3),
+        },
+        'stages': stages,
+    }
+
+
+def previous_run(path, result):
+    """Last recorded run with the same configuration from a different commit"""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('config') == result['config'] and entry.get('commit') != result['commit']:
+                previous = entry
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the TTS pipeline stages with a deterministic fake engine")
+    parser.add_argument('--csv', default=DEFAULT_CSV)
+    parser.add_argument('--rows', type=int, default=None, help="Only use the first N rows")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.02, help="Simulated engine round trip in seconds")
+    parser.add_argument('--format', default='mp3', help="Output format for the export stage")
+    parser.add_argument('--results', default=DEFAULT_RESULTS, help="JSON lines file the run is appended to")
+    args = parser.parse_args()
+
+    result = run(args)
+    baseline = previous_run(args.results, result)
+
+    totals = result['totals']
+    print(f"{result['config']['rows']} rows, {totals['chars']} chars, {totals['requests']} engine requests, "
+          f"{totals['audio_seconds']:.1f}s of audio, median of {args.repeats}")
+    header = f"{'stage':<18} {'median ms':>10} {'min ms':>10} {'throughput':>18}"
+    if baseline:
+        header += f" {'vs ' + baseline['commit']:>14}"
+    print(header)
+    for name, stage in result['stages'].items():
+        unit = next(key for key in stage if key.endswith('_per_s'))
+        line = (f"{name:<18} {stage['median_s'] * 1000:>10.1f} {stage['min_s'] * 1000:>10.1f} "
+                f"{stage[unit]:>12,.0f} {unit[:-6]}/s")
+        old = baseline and baseline['stages'].get(name)
+        if old:
+            change = (stage['median_s'] - old['median_s']) / old['median_s'] * 100 if old['median_s'] else 0.0
+            line += f" {change:>+13.1f}%"
+        print(line)
+    if baseline and baseline['totals'].get('output_checksum') != totals['output_checksum']:
+        print(f"Output differs from {baseline['commit']} (checksum changed)")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    with open(args.results, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(result, ensure_ascii=False) + '\n')
+    print(f"Appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Measure how much the segment planner reduces engine requests over
+TaEN_con.csv, for each engine's request size cap and a few island sizes.
+
+Usage: python backend/bench_planner.py [path/to/TaEN_con.csv]
+"""
+import csv
+import os
+import sys
+import time
+
+from engines import BUILTIN_CAPABILITIES
+from planner import DEFAULT_POLICY, estimate_cost_ms, plan_segments
+from segmenter import split_mixed_text
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'TaEN_con.csv')
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CSV
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = [row['conversation_text'] for row in csv.DictReader(f)]
+    split_rows = [split_mixed_text(text) for text in rows]
+    fragments = sum(len(segments) for segments in split_rows)
+    base_cost = sum(estimate_cost_ms(segments) for segments in split_rows)
+    print(f"{len(rows)} rows -> {fragments} fragments ({fragments / len(rows):.1f}/row), "
+          f"est. {base_cost / len(rows) / 1000:.1f} s/row sequential")
+
+    print(f"{'engine':<7} {'islands':>7} {'requests':>9} {'per row':>8} {'est. s/row':>11} {'plan ms':>8}")
+    for engine, capabilities in BUILTIN_CAPABILITIES.items():
+        max_chars = capabilities['max_request_chars']
+        for island_max_words in (0, 1, 2):
+            policy = dict(DEFAULT_POLICY, island_max_words=island_max_words)
+            start = time.perf_counter()
+            plans = [plan_segments(segments, policy, max_chars)[0] for segments in split_rows]
+            elapsed = (time.perf_counter() - start) * 1000
+            requests = sum(len(plan) for plan in plans)
+            cost = sum(estimate_cost_ms(plan, policy) for plan in plans)
+            print(f"{engine:<7} {island_max_words:>7} {requests:>9} {requests / len(rows):>8.1f} "
+                  f"{cost / len(rows) / 1000:>11.1f} {elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
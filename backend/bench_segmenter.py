@@ -0,0 +1,155 @@
+"""
+Benchmark the script-run segmenter against the previous per-word
+detect_language implementation over every row of TaEN_con.csv.
+
+Usage: python backend/bench_segmenter.py [path/to/TaEN_con.csv]
+"""
+import csv
+import os
+import re
+import sys
+import time
+
+from langdetect import DetectorFactory, detect, LangDetectException
+
+import segmenter
+from segmenter import TANGLISH_WORDS, split_mixed_text
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'TaEN_con.csv')
+
+# langdetect is randomized unless seeded
+DetectorFactory.seed = 0
+
+# ----------------------------------------------------------------------------
+# Previous implementation, kept verbatim for comparison
+# ----------------------------------------------------------------------------
+
+LANG_DETECT_CACHE = {}
+
+def legacy_detect_language(text):
+    """Detect if text is Tamil or English with Tanglish support (cached)"""
+    text_lower = text.lower().strip()
+    
+    # Check cache first
+    if text_lower in LANG_DETECT_CACHE:
+        return LANG_DETECT_CACHE[text_lower]
+    
+    try:
+        # Check for Tamil Unicode characters
+        tamil_chars = re.findall(r'[\u0B80-\u0BFF]', text)
+        if tamil_chars:
+            result = 'ta'
+        else:
+            # Check if it's a known Tanglish word
+            word_clean = re.sub(r'[^\w]', '', text_lower)
+            if word_clean in TANGLISH_WORDS:
+                result = 'ta-en'  # Tanglish - Tamil word in English script
+            # For short texts, default to English
+            elif len(text.strip()) < 3:
+                result = 'en'
+            else:
+                result = detect(text)
+        
+        # Cache the result
+        LANG_DETECT_CACHE[text_lower] = result
+        return result
+    except LangDetectException:
+        result = 'en'
+        LANG_DETECT_CACHE[text_lower] = result
+        return result
+
+def legacy_split_mixed_text(text):
+    """Split text into segments based on language"""
+    # Split by sentences while preserving punctuation
+    sentences = re.split(r'([.!?]+[\s]*)', text)
+    
+    # Reconstruct sentences with their punctuation
+    reconstructed = []
+    i = 0
+    while i < len(sentences):
+        if i + 1 < len(sentences) and re.match(r'[.!?]+[\s]*', sentences[i+1]):
+            reconstructed.append(sentences[i] + sentences[i+1])
+            i += 2
+        else:
+            if sentences[i].strip():
+                reconstructed.append(sentences[i])
+            i += 1
+    
+    segments = []
+    for sentence in reconstructed:
+        if not sentence.strip():
+            continue
+            
+        # Further split by language boundaries within sentence
+        current_segment = ""
+        current_lang = None
+        
+        words = sentence.split()
+        for word in words:
+            word_lang = legacy_detect_language(word)
+            
+            # Normalize language (treat ta-en as ta for grouping)
+            normalized_lang = 'ta' if word_lang in ['ta', 'ta-en'] else 'en'
+            
+            if current_lang is None:
+                current_lang = normalized_lang
+                current_segment = word
+            elif current_lang == normalized_lang:
+                current_segment += " " + word
+            else:
+                # Language change detected
+                if current_segment.strip():
+                    segments.append((current_segment.strip(), current_lang))
+                current_lang = normalized_lang
+                current_segment = word
+        
+        if current_segment.strip():
+            segments.append((current_segment.strip(), current_lang))
+    
+    return segments
+
+
+def load_rows(csv_path):
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        return [row['conversation_text'] for row in csv.DictReader(f)]
+
+
+def timed(fn, rows):
+    start = time.perf_counter()
+    results = [fn(text) for text in rows]
+    return time.perf_counter() - start, results
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CSV
+    rows = load_rows(csv_path)
+    words = sum(len(text.split()) for text in rows)
+    print(f"{len(rows)} rows, {words} words from {csv_path}")
+
+    LANG_DETECT_CACHE.clear()
+    legacy_cold, legacy_out = timed(legacy_split_mixed_text, rows)
+    legacy_warm, _ = timed(legacy_split_mixed_text, rows)
+
+    segmenter.classify_word.cache_clear()
+    new_cold, new_out = timed(split_mixed_text, rows)
+    new_warm, _ = timed(split_mixed_text, rows)
+
+    segmenter.detect_latin_run.cache_clear()
+    detect_cold, _ = timed(lambda text: split_mixed_text(text, use_langdetect=True), rows)
+
+    mismatches = sum(1 for a, b in zip(legacy_out, new_out) if a != b)
+    print(f"{'implementation':<32} {'seconds':>8} {'words/s':>12}")
+    for name, seconds in (
+        ('legacy, cold cache', legacy_cold),
+        ('legacy, warm cache', legacy_warm),
+        ('script-run, first pass', new_cold),
+        ('script-run, second pass', new_warm),
+        ('script-run + langdetect runs', detect_cold),
+    ):
+        print(f"{name:<32} {seconds:>8.3f} {words / seconds:>12,.0f}")
+    print(f"Speedup vs legacy (cold): {legacy_cold / new_cold:.1f}x, (warm): {legacy_warm / new_warm:.1f}x")
+    print(f"Legacy cache entries: {len(LANG_DETECT_CACHE)}, rows with different segments: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
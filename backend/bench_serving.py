@@ -0,0 +1,184 @@
+"""
+Concurrent-request throughput of the two ways to serve the backend: the
+Flask development server (python backend/main.py, app.run(debug=True))
+and the ASGI mode (python backend/asgi.py, Starlette under uvicorn).
+
+Each server is started in turn with the offline engine, which renders
+deterministic audio after a fixed simulated round trip, so the run needs
+no network and measures serving overhead rather than a TTS service. Every
+server gets empty caches in a fresh temporary directory, and every
+request converts a distinct row of TaEN_con.csv, so nothing is answered
+from the result cache. For each concurrency level the benchmark reports
+requests per second and latency percentiles for /convert. The run is
+appended as one JSON line to a results file together with the git commit.
+
+Usage: python backend/bench_serving.py [--modes flask,asgi] [--concurrency 1,8,32]
+           [--requests 64] [--latency-ms 200] [--results bench_results/serving.jsonl]
+"""
+import argparse
+import json
+import os
+import platform
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench_pipeline import DEFAULT_CSV, HERE, git_commit, load_rows
+
+DEFAULT_RESULTS = os.path.join(HERE, '..', 'bench_results', 'serving.jsonl')
+BASE_URL = 'http://127.0.0.1:5000'
+
+SERVERS = {
+    'flask': [sys.executable, os.path.join(HERE, 'main.py')],
+    'asgi': [sys.executable, os.path.join(HERE, 'asgi.py')],
+}
+
+
+def server_up():
+    try:
+        return requests.get(f'{BASE_URL}/health', timeout=1).ok
+    except requests.RequestException:
+        return False
+
+
+def start_server(mode, latency_ms, cache_dir, timeout=60):
+    """Start a server with the offline engine and wait until /health answers"""
+    env = dict(
+        os.environ,
+        TTS_ENGINE='offline',
+        TTS_OFFLINE_LATENCY_MS=str(latency_ms),
+        TTS_CACHE_DIR=os.path.join(cache_dir, 'segments'),
+        TTS_RESULT_CACHE_DIR=os.path.join(cache_dir, 'results'),
+        TTS_PARAGRAPH_CACHE_DIR=os.path.join(cache_dir, 'paragraphs'),
+    )
+    # Own process group, so the Flask reloader's child is stopped along with it
+    proc = subprocess.Popen(SERVERS[mode], cwd=HERE, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{mode} server exited with status {proc.returncode}")
+        if server_up():
+            return proc
+        time.sleep(0.25)
+    stop_server(proc)
+    raise RuntimeError(f"{mode} server did not answer /health within {timeout}s")
+
+
+def stop_server(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=10)
+    except ProcessLookupError:
+        pass
+    except subprocess.TimeoutExpired:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+
+
+def convert(text):
+    """POST one /convert; return (seconds, ok)"""
+    start = time.perf_counter()
+    try:
+        response = requests.post(f'{BASE_URL}/convert', data={'text': text, 'format': 'mp3'}, timeout=300)
+        ok = response.status_code == 200 and len(response.content) > 0
+    except requests.RequestException:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_level(texts, concurrency):
+    """Send every text with ``concurrency`` requests in flight"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(convert, texts))
+    wall = time.perf_counter() - start
+    latencies = [seconds for seconds, ok in results if ok]
+    return {
+        'requests': len(texts),
+        'errors': sum(1 for _, ok in results if not ok),
+        'wall_s': round(wall, 3),
+        'requests_per_s': round(len(latencies) / wall, 2) if wall else 0.0,
+        'p50_s': round(statistics.median(latencies), 3) if latencies else None,
+        'p95_s': round(percentile(latencies, 0.95), 3) if latencies else None,
+    }
+
+
+def bench_mode(mode, rows, args):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix=f'bench-{mode}-') as cache_dir:
+        proc = start_server(mode, args.latency_ms, cache_dir)
+        try:
+            # One untimed request loads the engine and warms the code paths
+            convert('Warm up request.')
+            offset = 0
+            for concurrency in args.concurrency:
+                # Fresh text for every request across all levels, so none is a cache hit
+                texts = [f"{rows[(offset + i) % len(rows)]}\nRequest {offset + i}."
+                         for i in range(args.requests)]
+                offset += args.requests
+                results[str(concurrency)] = run_level(texts, concurrency)
+        finally:
+            stop_server(proc)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare /convert throughput of the Flask and ASGI servers")
+    parser.add_argument('--modes', default='flask,asgi', help="Comma-separated servers to run")
+    parser.add_argument('--concurrency', default='1,8,32', help="Comma-separated in-flight request counts")
+    parser.add_argument('--requests', type=int, default=64, help="Requests per concurrency level")
+    parser.add_argument('--latency-ms', type=int, default=200, help="Simulated engine round trip")
+    parser.add_argument('--csv', default=DEFAULT_CSV)
+    parser.add_argument('--results', default=DEFAULT_RESULTS, help="JSON lines file the run is appended to")
+    args = parser.parse_args()
+    args.concurrency = [int(n) for n in args.concurrency.split(',')]
+    modes = [mode.strip() for mode in args.modes.split(',')]
+    unknown = [mode for mode in modes if mode not in SERVERS]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+    if server_up():
+        sys.exit(f"Something is already serving {BASE_URL}; stop it first")
+
+    rows = load_rows(args.csv)
+    result = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'config': {
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'latency_ms': args.latency_ms,
+        },
+        'modes': {mode: bench_mode(mode, rows, args) for mode in modes},
+    }
+
+    print(f"{args.requests} /convert requests per level, {args.latency_ms} ms simulated engine latency")
+    print(f"{'mode':<6} {'in flight':>9} {'req/s':>8} {'p50 s':>8} {'p95 s':>8} {'errors':>7}")
+    for mode, levels in result['modes'].items():
+        for concurrency, level in levels.items():
+            p50 = f"{level['p50_s']:.3f}" if level['p50_s'] is not None else '-'
+            p95 = f"{level['p95_s']:.3f}" if level['p95_s'] is not None else '-'
+            print(f"{mode:<6} {concurrency:>9} {level['requests_per_s']:>8.2f} {p50:>8} {p95:>8} "
+                  f"{level['errors']:>7}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    with open(args.results, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(result, ensure_ascii=False) + '\n')
+    print(f"Appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark segment fan-out: blocking engine calls inside asyncio.gather
+versus the executor-backed SynthesisPool.
+
+The engine is simulated with a fixed network latency so the numbers only
+reflect scheduling, not gTTS availability.
+
+Usage: python backend/bench_synthesis.py [latency_seconds] [concurrency]
+"""
+import asyncio
+import sys
+import time
+
+from synthesis import SynthesisPool
+
+
+def fake_blocking_engine(text, lang, latency):
+    """Stand-in for generate_gtts_audio: blocks for one round trip"""
+    time.sleep(latency)
+    return b'\x00' * len(text), 'fake'
+
+
+async def run_inline(n, latency):
+    """Old behaviour: synchronous engine called directly from the coroutine"""
+    async def segment(i):
+        return fake_blocking_engine(f"segment {i}", 'en', latency)
+    await asyncio.gather(*[segment(i) for i in range(n)])
+
+
+async def run_pooled(pool, n, latency):
+    """New behaviour: engine call dispatched to the synthesis pool"""
+    await asyncio.gather(*[
+        pool.run('gtts', fake_blocking_engine, f"segment {i}", 'en', latency)
+        for i in range(n)
+    ])
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    pool = SynthesisPool(max_workers=32, limits={'gtts': concurrency})
+
+    print(f"Simulated engine latency: {latency * 1000:.0f} ms, gtts concurrency: {concurrency}")
+    print(f"{'segments':>8} {'inline (s)':>11} {'pooled (s)':>11} {'speedup':>8}")
+    for n in (1, 2, 4, 8, 16, 32):
+        start = time.perf_counter()
+        asyncio.run(run_inline(n, latency))
+        inline = time.perf_counter() - start
+
+        start = time.perf_counter()
+        asyncio.run(run_pooled(pool, n, latency))
+        pooled = time.perf_counter() - start
+
+        print(f"{n:>8} {inline:>11.3f} {pooled:>11.3f} {inline / pooled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# main reads its engine and cache locations at import: render offline into throwaway caches
+_CACHE_ROOT = tempfile.mkdtemp(prefix='tts-test-')
+os.environ.setdefault('TTS_ENGINE', 'offline')
+os.environ['TTS_CACHE_DIR'] = os.path.join(_CACHE_ROOT, 'segments')
+os.environ['TTS_RESULT_CACHE_DIR'] = os.path.join(_CACHE_ROOT, 'results')
+os.environ['TTS_PARAGRAPH_CACHE_DIR'] = os.path.join(_CACHE_ROOT, 'paragraphs')
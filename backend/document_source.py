@@ -0,0 +1,124 @@
+import codecs
+import os
+import shutil
+import uuid
+import zipfile
+import xml.etree.ElementTree as ET
+
+# Longest line read from a .txt upload in one piece; longer lines are cut at a space
+MAX_LINE_CHARS = 10000
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def _iter_txt_paragraphs(path, max_chars=MAX_LINE_CHARS):
+    """Yield ``(line, fraction_read)`` from a UTF-8 text file without loading it whole"""
+    total = os.path.getsize(path) or 1
+    read = 0
+    carry = ''
+    # A cut over-long line may end mid-character; the decoder holds those bytes back
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        while True:
+            piece = f.readline(max_chars)
+            if not piece:
+                break
+            read += len(piece)
+            line = carry + decoder.decode(piece)
+            carry = ''
+            if not piece.endswith(b'\n') and len(piece) == max_chars:
+                # Over-long line: cut at the last space and carry the rest
+                cut = line.rfind(' ')
+                if cut > 0:
+                    line, carry = line[:cut], line[cut + 1:]
+            yield line.rstrip('\r\n'), read / total
+    if carry:
+        yield carry, 1.0
+
+
+def _iter_docx_paragraphs(path):
+    """Yield ``(paragraph, fraction_read)`` from a DOCX by streaming its document XML"""
+    with zipfile.ZipFile(path) as archive:
+        total = archive.getinfo('word/document.xml').file_size or 1
+        with archive.open('word/document.xml') as xml:
+            for _, elem in ET.iterparse(xml):
+                if elem.tag != f'{_W}p':
+                    continue
+                parts = []
+                for node in elem.iter():
+                    if node.tag == f'{_W}t' and node.text:
+                        parts.append(node.text)
+                    elif node.tag == f'{_W}tab':
+                        parts.append('\t')
+                    elif node.tag in (f'{_W}br', f'{_W}cr'):
+                        parts.append('\n')
+                # Drop the parsed paragraph so memory stays flat
+                elem.clear()
+                yield ''.join(parts), min(1.0, xml.tell() / total)
+
+
+class DocumentSource:
+    """Text to convert, either held in memory or spooled to disk from an upload.
+
+    Uploads are saved to a file instead of being read into memory, and
+    paragraphs are read back lazily, so a book-length document is never
+    held as one string. ``chunks()`` groups paragraphs into render units of
+    bounded size.
+    """
+
+    def __init__(self, text=None, path=None, kind='txt'):
+        self.text = text
+        self.path = path
+        self.kind = kind
+
+    @classmethod
+    def from_upload(cls, filename, stream, directory):
+        """Save an uploaded .txt/.docx to ``directory``; None for other file types"""
+        kind = os.path.splitext(filename.lower())[1].lstrip('.')
+        if kind not in ('txt', 'docx'):
+            return None
+        path = os.path.join(directory, f"{uuid.uuid4().hex}.upload.{kind}")
+        # Copied in blocks, whether the framework spooled it to memory or disk
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(stream, f)
+        return cls(path=path, kind=kind)
+
+    def paragraphs(self):
+        """Yield ``(paragraph, fraction_read)`` pairs in document order"""
+        if self.text is not None:
+            lines = self.text.split('\n')
+            total = len(self.text) or 1
+            read = 0
+            for line in lines:
+                read += len(line) + 1
+                yield line, min(1.0, read / total)
+        elif self.kind == 'docx':
+            yield from _iter_docx_paragraphs(self.path)
+        else:
+            yield from _iter_txt_paragraphs(self.path)
+
+    def chunks(self, max_chars):
+        """Yield ``(paragraphs, fraction_read)`` render units of roughly ``max_chars`` characters"""
+        pending = []
+        size = 0
+        pending_fraction = 0.0
+        for paragraph, fraction in self.paragraphs():
+            if pending and size + len(paragraph) > max_chars:
+                yield pending, pending_fraction
+                pending, size = [], 0
+            pending.append(paragraph)
+            size += len(paragraph) + 1
+            pending_fraction = fraction
+        if pending:
+            yield pending, 1.0
+
+    def is_empty(self):
+        return not any(paragraph.strip() for paragraph, _ in self.paragraphs())
+
+    def discard(self):
+        """Delete the spooled upload, if any"""
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
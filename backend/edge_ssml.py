@@ -0,0 +1,107 @@
+import re
+from xml.sax.saxutils import escape, quoteattr
+
+import aiohttp
+from edge_tts.communicate import (
+    connect_id,
+    date_to_string,
+    get_headers_and_data,
+    remove_incompatible_characters,
+    ssml_headers_plus_data,
+)
+from edge_tts.constants import WSS_URL
+
+# Audio format requested from the service, same as edge_tts uses
+OUTPUT_FORMAT = 'audio-24khz-48kbitrate-mono-mp3'
+# The service drops websocket messages above 64 KiB
+MAX_MESSAGE_BYTES = 2 ** 16 - 512
+
+_HEADERS = {
+    "Pragma": "no-cache",
+    "Cache-Control": "no-cache",
+    "Origin": "chrome-extension://jdiccldimpdaibmpdkjnbmckianbfold",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Accept-Language": "en-US,en;q=0.9",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    " (KHTML, like Gecko) Chrome/91.0.4472.77 Safari/537.36 Edg/91.0.864.41",
+}
+
+
+class EdgeSSMLError(Exception):
+    """The service refused or cut short a multi-voice request"""
+
+
+def full_voice_name(voice):
+    """``ta-IN-PallaviNeural`` -> ``Microsoft Server Speech Text to Speech Voice (ta-IN, PallaviNeural)``"""
+    match = re.match(r"^([a-z]{2,3})-([A-Z]{2})-(.+Neural)$", voice)
+    if not match:
+        return voice
+    return f"Microsoft Server Speech Text to Speech Voice ({match.group(1)}-{match.group(2)}, {match.group(3)})"
+
+
+def build_ssml(segments, voices, rates):
+    """One SSML document reading ``(text, lang)`` segments with a ``<voice>`` per segment"""
+    parts = []
+    for text, lang in segments:
+        text = escape(remove_incompatible_characters(text))
+        parts.append(
+            f"<voice name={quoteattr(full_voice_name(voices[lang]))}>"
+            f"<prosody pitch='+0Hz' rate={quoteattr(rates.get(lang, '+0%'))} volume='+0%'>"
+            f"{text}</prosody></voice>"
+        )
+    return (
+        "<speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' xml:lang='en-US'>"
+        + "".join(parts) + "</speak>"
+    )
+
+
+async def synthesize_ssml(ssml, url=WSS_URL, timeout=60):
+    """Send one SSML document over a single websocket session and return the MP3 bytes"""
+    date = date_to_string()
+    request = ssml_headers_plus_data(connect_id(), date, ssml)
+    if len(request.encode('utf-8')) > MAX_MESSAGE_BYTES:
+        raise EdgeSSMLError("SSML document is too large for one request")
+
+    separator = '&' if '?' in url else '?'
+    audio = bytearray()
+    receiving = False
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(trust_env=True, timeout=client_timeout) as session, session.ws_connect(
+        f"{url}{separator}ConnectionId={connect_id()}",
+        compress=15,
+        autoclose=True,
+        autoping=True,
+        headers=_HEADERS,
+    ) as websocket:
+        await websocket.send_str(
+            f"X-Timestamp:{date}\r\n"
+            "Content-Type:application/json; charset=utf-8\r\n"
+            "Path:speech.config\r\n\r\n"
+            '{"context":{"synthesis":{"audio":{"metadataoptions":{'
+            '"sentenceBoundaryEnabled":false,"wordBoundaryEnabled":false},'
+            f'"outputFormat":"{OUTPUT_FORMAT}"'
+            "}}}}\r\n"
+        )
+        await websocket.send_str(request)
+
+        async for message in websocket:
+            if message.type == aiohttp.WSMsgType.TEXT:
+                path = get_headers_and_data(message.data)[0].get(b"Path")
+                if path == b"turn.start":
+                    receiving = True
+                elif path == b"turn.end":
+                    break
+            elif message.type == aiohttp.WSMsgType.BINARY:
+                if not receiving or len(message.data) < 2:
+                    raise EdgeSSMLError("Unexpected binary message")
+                header_length = int.from_bytes(message.data[:2], "big")
+                audio.extend(message.data[header_length + 2:])
+            elif message.type == aiohttp.WSMsgType.ERROR:
+                raise EdgeSSMLError(str(message.data or "websocket error"))
+        else:
+            # The connection closed before turn.end
+            raise EdgeSSMLError("Connection closed before the audio was complete")
+
+    if not audio:
+        raise EdgeSSMLError("No audio received")
+    return bytes(audio)
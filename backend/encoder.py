@@ -0,0 +1,82 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+from assembly import CANONICAL_RATE, to_audio_segment
+
+# Output formats a client can ask for. Settings are tuned for speech:
+# libsndfile's compression_level runs from 0 (best quality) to 1 (smallest),
+# 0.6 gives 64 kbps constant-rate MP3 and 0.9 roughly 30 kbps Opus.
+OUTPUT_FORMATS = {
+    'mp3': {
+        'mimetype': 'audio/mpeg', 'extension': 'mp3',
+        'sf': {'format': 'MP3', 'subtype': 'MPEG_LAYER_III', 'bitrate_mode': 'CONSTANT', 'compression_level': 0.6},
+        'ffmpeg': {'format': 'mp3', 'bitrate': '64k'},
+    },
+    'opus': {
+        'mimetype': 'audio/ogg', 'extension': 'ogg',
+        'sf': {'format': 'OGG', 'subtype': 'OPUS', 'compression_level': 0.9},
+        'ffmpeg': {'format': 'ogg', 'codec': 'libopus', 'bitrate': '32k'},
+    },
+    'wav': {
+        'mimetype': 'audio/wav', 'extension': 'wav',
+        'sf': {'format': 'WAV', 'subtype': 'PCM_16'},
+    },
+    # Headerless 16-bit little-endian mono at the canonical rate. audio/L16 is
+    # big-endian by definition (RFC 2586), so the bytes go out untyped
+    'pcm': {
+        'mimetype': 'application/octet-stream', 'extension': 'pcm',
+    },
+}
+FORMAT_ALIASES = {'ogg': 'opus', 'mpeg': 'mp3', 'raw': 'pcm'}
+# Self-contained chunks of these formats can simply be concatenated
+STREAMABLE_FORMATS = ('mp3', 'pcm')
+
+
+def resolve_format(name):
+    """Canonical format name for ``name`` (case-insensitive, aliases allowed), or None"""
+    name = (name or '').strip().lower()
+    name = FORMAT_ALIASES.get(name, name)
+    return name if name in OUTPUT_FORMATS else None
+
+
+def _sf_supports(options):
+    return options['subtype'] in sf.available_subtypes(options['format'])
+
+
+def encode(samples, rate=CANONICAL_RATE, fmt='mp3'):
+    """Encode mono float32 samples to ``fmt`` bytes.
+
+    Encoding happens in-process through libsndfile; only when the local
+    libsndfile lacks the codec does it fall back to a pydub/ffmpeg export.
+    """
+    spec = OUTPUT_FORMATS[fmt]
+    if fmt == 'pcm':
+        return (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+    buf = io.BytesIO()
+    if _sf_supports(spec['sf']):
+        sf.write(buf, samples, rate, **spec['sf'])
+    else:
+        to_audio_segment(samples, rate).export(buf, **spec['ffmpeg'])
+    return buf.getvalue()
+
+
+def encode_to_file(blocks, path, rate=CANONICAL_RATE, fmt='mp3'):
+    """Encode an iterable of mono float32 blocks to ``fmt`` at ``path``.
+
+    libsndfile and raw PCM are written block by block, so memory stays
+    bounded by one block; the ffmpeg fallback needs the whole signal.
+    """
+    spec = OUTPUT_FORMATS[fmt]
+    if fmt == 'pcm':
+        with open(path, 'wb') as f:
+            for block in blocks:
+                f.write(encode(block, rate, 'pcm'))
+    elif _sf_supports(spec['sf']):
+        with sf.SoundFile(path, 'w', samplerate=rate, channels=1, **spec['sf']) as f:
+            for block in blocks:
+                f.write(block)
+    else:
+        samples = np.concatenate(list(blocks) or [np.zeros(0, dtype=np.float32)])
+        to_audio_segment(samples, rate).export(path, **spec['ffmpeg'])
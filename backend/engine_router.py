@@ -0,0 +1,236 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Circuit breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+# Timing of the router attempt the current task (or executor call) belongs to
+_round_trip = contextvars.ContextVar('tts_engine_round_trip', default=None)
+
+
+@contextmanager
+def round_trip():
+    """Time a real request to an engine, as opposed to a cache hit or a wait for a slot.
+
+    Engines wrap their service or model call in this; the router only learns
+    latency from attempts that made one.
+    """
+    timing = _round_trip.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timing is not None:
+            timing['ms'] = timing.get('ms', 0.0) + (time.perf_counter() - start) * 1000
+
+
+class AllEnginesFailed(Exception):
+    """Every engine the router tried failed or returned no audio"""
+
+    def __init__(self, tried):
+        super().__init__(f"All TTS engines failed. Tried: {', '.join(tried)}")
+        self.tried = tried
+
+
+class _EngineHealth:
+    def __init__(self, window):
+        self.ewma_ms = None
+        self.error_rate = 0.0
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.hedges_won = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.last_request = 0.0
+
+
+class EngineRouter:
+    """Picks the engine order per request from observed latency and failures.
+
+    Engines are ranked by their latency EWMA inflated by their recent error
+    rate. Engines with no samples yet, or none for ``probe_seconds``, keep
+    their configured position ahead of measured ones so a single slow
+    request does not starve an engine forever. ``failure_threshold`` consecutive
+    failures open an engine's breaker for ``open_seconds``, after which the
+    next request is a trial that closes or reopens it. With hedging on, when
+    the first engine is slower than its own ``hedge_percentile`` latency a
+    second request goes to the next engine and the first answer wins.
+    Latency is taken from ``round_trip()`` spans only, so cache hits and
+    waits for a concurrency slot do not skew the hedge threshold.
+    """
+
+    def __init__(self, failure_threshold=3, open_seconds=30, hedge=True, hedge_percentile=0.9,
+                 min_samples=5, alpha=0.2, window=100, probe_seconds=30):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self.window = window
+        self.probe_seconds = probe_seconds
+        self._engines = {}
+        self._hedges = 0
+        self._lock = threading.Lock()
+
+    def _health(self, engine):
+        health = self._engines.get(engine)
+        if health is None:
+            health = self._engines[engine] = _EngineHealth(self.window)
+        return health
+
+    def _available(self, health, now):
+        if health.state == OPEN and now - health.opened_at >= self.open_seconds:
+            # Let the next request through as a trial
+            health.state = HALF_OPEN
+        return health.state != OPEN
+
+    def order(self, candidates):
+        """Candidates to try, fastest healthy engine first"""
+        now = time.time()
+        with self._lock:
+            healths = {engine: self._health(engine) for engine in candidates}
+            available = [engine for engine in candidates if self._available(healths[engine], now)]
+            if not available:
+                # Every breaker is open: trying is better than failing outright
+                return list(candidates)
+
+            def score(engine):
+                health = healths[engine]
+                if health.state == HALF_OPEN or now - health.last_request > self.probe_seconds:
+                    return 0.0
+                if health.ewma_ms is None:
+                    # Only failures so far
+                    return float('inf') if health.failures else 0.0
+                return health.ewma_ms / max(0.05, 1.0 - health.error_rate)
+
+            return sorted(available, key=score)
+
+    def record(self, engine, ok, latency_ms=None):
+        with self._lock:
+            health = self._health(engine)
+            health.requests += 1
+            health.last_request = time.time()
+            health.error_rate += self.alpha * ((0.0 if ok else 1.0) - health.error_rate)
+            if ok:
+                health.latencies.append(latency_ms)
+                if health.ewma_ms is None:
+                    health.ewma_ms = latency_ms
+                else:
+                    health.ewma_ms += self.alpha * (latency_ms - health.ewma_ms)
+                health.consecutive_failures = 0
+                health.state = CLOSED
+                return
+            health.failures += 1
+            health.consecutive_failures += 1
+            if health.state == HALF_OPEN or health.consecutive_failures >= self.failure_threshold:
+                if health.state != OPEN:
+                    print(f"Circuit breaker opened for {engine} after {health.consecutive_failures} failures")
+                health.state = OPEN
+                health.opened_at = time.time()
+
+    def hedge_delay(self, engine):
+        """Seconds to wait on ``engine`` before hedging, or None without enough samples"""
+        with self._lock:
+            latencies = sorted(self._health(engine).latencies)
+        if len(latencies) < self.min_samples:
+            return None
+        index = min(len(latencies) - 1, int(self.hedge_percentile * len(latencies)))
+        return latencies[index] / 1000
+
+    async def _attempt(self, engine, invoke):
+        # Every attempt runs in its own task, so this timing is not shared with a hedge
+        timing = {}
+        _round_trip.set(timing)
+        try:
+            result = await invoke(engine)
+        except Exception as e:
+            print(f"{engine} error: {e}")
+            self.record(engine, False)
+            return None
+        ok = bool(result and result[0] is not None)
+        if not ok:
+            self.record(engine, False)
+        elif 'ms' in timing:
+            self.record(engine, True, timing['ms'])
+        # A cache hit says nothing about the engine's latency or health
+        return result if ok else None
+
+    async def call(self, candidates, invoke):
+        """Run ``await invoke(engine)`` on the best engine, falling back and hedging as needed.
+
+        ``invoke`` returns ``(audio, engine)`` with ``audio`` None on failure.
+        """
+        remaining = self.order(candidates)
+        tried = []
+        pending = {}
+        hedged = False
+
+        def start(engine):
+            tried.append(engine)
+            pending[asyncio.ensure_future(self._attempt(engine, invoke))] = engine
+
+        start(remaining.pop(0))
+        try:
+            while pending:
+                timeout = None
+                if self.hedge and remaining and len(pending) == 1:
+                    timeout = self.hedge_delay(tried[-1])
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    with self._lock:
+                        self._hedges += 1
+                    start(remaining.pop(0))
+                    continue
+                for task in done:
+                    engine = pending.pop(task)
+                    if task.result():
+                        if hedged and engine != tried[0]:
+                            with self._lock:
+                                self._health(engine).hedges_won += 1
+                        return task.result()
+                if not pending and remaining:
+                    start(remaining.pop(0))
+            raise AllEnginesFailed(tried)
+        finally:
+            # The losing request of a hedge is no longer needed
+            for task in pending:
+                task.cancel()
+
+    def status(self, engine):
+        """'available', 'degraded' (trial after an outage) or 'unavailable'"""
+        with self._lock:
+            state = self._health(engine).state
+        return {CLOSED: 'available', HALF_OPEN: 'degraded', OPEN: 'unavailable'}[state]
+
+    def stats(self):
+        with self._lock:
+            engines = {}
+            for engine, health in self._engines.items():
+                latencies = sorted(health.latencies)
+                engines[engine] = {
+                    'state': health.state,
+                    'requests': health.requests,
+                    'failures': health.failures,
+                    'consecutive_failures': health.consecutive_failures,
+                    'error_rate': round(health.error_rate, 3),
+                    'latency_ewma_ms': round(health.ewma_ms, 1) if health.ewma_ms is not None else None,
+                    'latency_p90_ms': round(latencies[int(0.9 * (len(latencies) - 1))], 1) if latencies else None,
+                    'hedges_won': health.hedges_won,
+                }
+            return {
+                'hedging': self.hedge,
+                'hedge_percentile': self.hedge_percentile,
+                'hedges': self._hedges,
+                'engines': engines,
+            }
@@ -0,0 +1,145 @@
+import fake_engine
+from assembly import CANONICAL_RATE
+from engine_router import round_trip
+
+
+class EngineCapabilities:
+    """What an engine can do, used to size its requests and parallelism.
+
+    ``max_request_chars`` caps the text sent in one request,
+    ``concurrency`` is how many requests may safely be in flight at once,
+    ``sample_rate`` is the rate the engine produces natively,
+    ``languages`` lists the language codes it can voice and ``streams``
+    says whether it delivers audio incrementally.
+    """
+
+    def __init__(self, max_request_chars, concurrency, sample_rate, languages, streams=False):
+        self.max_request_chars = max_request_chars
+        self.concurrency = concurrency
+        self.sample_rate = sample_rate
+        self.languages = tuple(languages)
+        self.streams = streams
+
+    def supports(self, lang):
+        return lang in self.languages
+
+    def as_dict(self):
+        return {
+            'max_request_chars': self.max_request_chars,
+            'concurrency': self.concurrency,
+            'sample_rate': self.sample_rate,
+            'languages': list(self.languages),
+            'streams': self.streams,
+        }
+
+
+# What the built-in engines can do, the one place their limits are declared.
+# Concurrency is configurable, so it is supplied when the descriptor is built.
+BUILTIN_CAPABILITIES = {
+    'gtts': {'max_request_chars': 100, 'sample_rate': 24000, 'languages': ('en', 'ta')},
+    'edge': {'max_request_chars': 1000, 'sample_rate': 24000, 'languages': ('en', 'ta'), 'streams': True},
+    'hf-tts': {'max_request_chars': 300, 'sample_rate': 44100, 'languages': ('en', 'ta')},
+    'offline': {'max_request_chars': 1000, 'sample_rate': CANONICAL_RATE, 'languages': ('en', 'ta')},
+}
+
+
+def builtin_capabilities(name, concurrency):
+    """Capability descriptor of a built-in engine with the configured ``concurrency``"""
+    return EngineCapabilities(concurrency=concurrency, **BUILTIN_CAPABILITIES[name])
+
+
+class TTSEngine:
+    """Interface every TTS engine implements.
+
+    ``await engine.synthesize(text, lang)`` returns the audio as an
+    AudioSegment or a ``(samples, sample_rate)`` pair, or None on failure.
+    Implementations run under the SynthesisPool limit named after the engine,
+    which is set from ``capabilities.concurrency``.
+    """
+
+    def __init__(self, name, capabilities, pool):
+        self.name = name
+        self.capabilities = capabilities
+        self.pool = pool
+        pool.set_limit(name, capabilities.concurrency)
+
+    async def synthesize(self, text, lang):
+        raise NotImplementedError
+
+
+class BlockingEngine(TTSEngine):
+    """A blocking ``fn(text, lang) -> (audio, name)`` engine run on the pool's threads"""
+
+    def __init__(self, name, capabilities, pool, fn):
+        super().__init__(name, capabilities, pool)
+        self.fn = fn
+
+    async def synthesize(self, text, lang):
+        audio, _ = await self.pool.run(self.name, self.fn, text, lang)
+        return audio
+
+
+class AsyncEngine(TTSEngine):
+    """A coroutine ``fn(text, lang) -> (audio, name)`` engine awaited under the pool's limit"""
+
+    def __init__(self, name, capabilities, pool, fn):
+        super().__init__(name, capabilities, pool)
+        self.fn = fn
+
+    async def synthesize(self, text, lang):
+        audio, _ = await self.pool.run_async(self.name, self.fn, text, lang)
+        return audio
+
+
+class OfflineEngine(TTSEngine):
+    """Deterministic local engine for load testing; needs no network or model.
+
+    Audio comes from fake_engine, so the same text always gives the same
+    samples at a realistic length. ``latency`` seconds simulate a round trip.
+    """
+
+    def __init__(self, pool, latency=0.0, concurrency=32, name='offline'):
+        super().__init__(name, builtin_capabilities('offline', concurrency), pool)
+        self.latency = latency
+
+    def _synthesize(self, text, lang):
+        with round_trip():
+            return fake_engine.synthesize(text, lang, self.latency)
+
+    async def synthesize(self, text, lang):
+        return await self.pool.run(self.name, self._synthesize, text, lang)
+
+
+class EngineRegistry:
+    """Registered engines by name, with the capability lookups the scheduler needs"""
+
+    def __init__(self):
+        self._engines = {}
+
+    def register(self, engine):
+        self._engines[engine.name] = engine
+        return engine
+
+    def get(self, name):
+        engine = self._engines.get(name)
+        if engine is None:
+            raise ValueError(f"Unknown TTS engine '{name}'")
+        return engine
+
+    def __contains__(self, name):
+        return name in self._engines
+
+    def names(self):
+        return list(self._engines)
+
+    def candidates(self, names, lang):
+        """The registered engines among ``names`` that can voice ``lang``, in order"""
+        return [name for name in names if name in self._engines and self._engines[name].capabilities.supports(lang)]
+
+    def max_request_chars(self, names):
+        """Largest request every engine in ``names`` accepts, or None if none is registered"""
+        limits = [self._engines[name].capabilities.max_request_chars for name in names if name in self._engines]
+        return min(limits) if limits else None
+
+    def describe(self):
+        return {name: engine.capabilities.as_dict() for name, engine in self._engines.items()}
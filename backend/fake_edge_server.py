@@ -0,0 +1,85 @@
+"""
+Local stand-in for the Edge read-aloud websocket, for testing the multi-voice SSML mode.
+
+Speaks the same framing as the real service (speech.config + ssml text
+messages in, turn.start / binary audio / turn.end out) and answers every
+<voice> element with the same sample MP3, so the returned audio grows with
+the number of voice switches. ``--latency-ms`` delays each handshake to
+mimic the round trip to the real service.
+
+Usage:
+    python backend/fake_edge_server.py [--port 8765] [--latency-ms 150] [--reject-multivoice]
+    TTS_EDGE_WSS_URL=ws://127.0.0.1:8765/edge/v1 TTS_EDGE_MULTIVOICE=1 python backend/main.py
+"""
+import argparse
+import asyncio
+import os
+import re
+
+from aiohttp import WSMsgType, web
+
+DEFAULT_AUDIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'mac audio', '1.mp3')
+CHUNK_BYTES = 4096
+
+
+def _text_message(request_id, path, body=''):
+    return f"X-RequestId:{request_id}\r\nContent-Type:application/json; charset=utf-8\r\nPath:{path}\r\n\r\n{body}"
+
+
+def _audio_message(request_id, chunk):
+    header = f"X-RequestId:{request_id}\r\nContent-Type:audio/mpeg\r\nPath:audio\r\n".encode()
+    return len(header).to_bytes(2, 'big') + header + chunk
+
+
+def make_app(audio, latency_ms=0, reject_multivoice=False):
+    stats = {'connections': 0, 'requests': 0, 'voices': 0}
+
+    async def edge_ws(request):
+        stats['connections'] += 1
+        await asyncio.sleep(latency_ms / 1000)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            if message.type != WSMsgType.TEXT or 'Path:ssml' not in message.data:
+                continue
+            request_id = re.search(r'X-RequestId:(\w+)', message.data).group(1)
+            voices = len(re.findall(r'<voice\b', message.data))
+            stats['requests'] += 1
+            stats['voices'] += voices
+            if reject_multivoice and voices > 1:
+                await ws.close()
+                break
+            await ws.send_str(_text_message(request_id, 'turn.start', '{}'))
+            for _ in range(voices):
+                for i in range(0, len(audio), CHUNK_BYTES):
+                    await ws.send_bytes(_audio_message(request_id, audio[i:i + CHUNK_BYTES]))
+            await ws.send_str(_text_message(request_id, 'turn.end', '{}'))
+        return ws
+
+    async def get_stats(request):
+        return web.json_response(stats)
+
+    app = web.Application()
+    app.router.add_get('/edge/v1', edge_ws)
+    app.router.add_get('/stats', get_stats)
+    app['stats'] = stats
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Edge TTS websocket server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--audio', default=DEFAULT_AUDIO, help="MP3 returned for every <voice> element")
+    parser.add_argument('--latency-ms', type=int, default=0, help="delay before each handshake")
+    parser.add_argument('--reject-multivoice', action='store_true', help="drop requests with more than one voice")
+    args = parser.parse_args()
+
+    with open(args.audio, 'rb') as f:
+        audio = f.read()
+    print(f"Fake Edge server on ws://{args.host}:{args.port}/edge/v1")
+    web.run_app(make_app(audio, args.latency_ms, args.reject_multivoice), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import hashlib
+import time
+
+import numpy as np
+
+from assembly import CANONICAL_RATE
+
+# Roughly the speaking rate of gTTS and Edge voices at normal speed
+CHARS_PER_SECOND = 14.0
+SYLLABLE_SECONDS = 0.18
+
+
+def _seed(text, lang):
+    return int.from_bytes(hashlib.sha256(f"{lang}\x1f{text}".encode('utf-8')).digest()[:8], 'little')
+
+
+def synthesize(text, lang='en', latency=0.0, rate=CANONICAL_RATE, chars_per_second=CHARS_PER_SECOND):
+    """Deterministic speech-like audio for ``text``: ``(samples, rate)``, no network.
+
+    The length follows a real engine's speaking rate and the signal is a
+    run of voiced "syllables" whose pitch and loudness are drawn from a
+    generator seeded by the text, so the same input always gives the same
+    samples. ``latency`` simulates one engine round trip by blocking.
+    """
+    if latency:
+        time.sleep(latency)
+    rng = np.random.default_rng(_seed(text, lang))
+    n = max(int(rate * 0.1), int(rate * len(text) / chars_per_second))
+    syllable = int(rate * SYLLABLE_SECONDS)
+    count = -(-n // syllable)
+
+    # Pitch and loudness per syllable, held for its duration
+    pitch = np.repeat(rng.uniform(110.0, 240.0, count), syllable)[:n]
+    level = np.repeat(rng.uniform(0.1, 0.3, count), syllable)[:n]
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voiced = np.sin(phase) + 0.5 * np.sin(2 * phase) + 0.25 * np.sin(3 * phase)
+    # Rise and fall inside each syllable so joins are not clicks
+    envelope = np.tile(np.hanning(syllable), count)[:n]
+    noise = rng.normal(0.0, 0.01, n)
+    samples = (voiced * envelope * level + noise).astype(np.float32)
+    return samples, rate
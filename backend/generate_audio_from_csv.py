@@ -1,108 +1,159 @@
+import argparse
+import json
+import logging
+import multiprocessing
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
-import torch
-from parler_tts import ParlerTTSForConditionalGeneration
-from transformers import AutoTokenizer
-import soundfile as sf
-from pydub import AudioSegment
-import tempfile
 
-HF_TTS_MODEL = "ai4bharat/indic-parler-tts"
-# Token must be provided via environment variable. Do NOT store secrets in the repository.
-HF_TOKEN = os.getenv("TTS_HF_TOKEN") or os.getenv("HF_TOKEN")  # Read from environment
+from assembly import to_audio_segment
+from parler_registry import get_model
+
+# Token must be provided via environment variable TTS_HF_TOKEN or HF_TOKEN (read by parler_registry).
 
 
 def generate_hf_tts_audio(prompt, description=None):
     """
     Generate audio using ai4bharat/indic-parler-tts from Hugging Face.
+    The model is loaded once per process by parler_registry.
     Returns a pydub.AudioSegment object.
     """
-    import logging
+    audio_arr, sampling_rate = get_model().generate(prompt, description)
+    return to_audio_segment(audio_arr, sampling_rate)
+
+
+def _quiet_logging():
     logging.getLogger("transformers.configuration_utils").setLevel(logging.ERROR)
     logging.getLogger("transformers.modeling_utils").setLevel(logging.ERROR)
     logging.getLogger("transformers.tokenization_utils_base").setLevel(logging.ERROR)
     logging.getLogger("transformers").setLevel(logging.ERROR)
     logging.getLogger("parler_tts").setLevel(logging.ERROR)
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    model = ParlerTTSForConditionalGeneration.from_pretrained(HF_TTS_MODEL, token=HF_TOKEN).to(device)
-    tokenizer = AutoTokenizer.from_pretrained(HF_TTS_MODEL, token=HF_TOKEN)
-    description_tokenizer = AutoTokenizer.from_pretrained(model.config.text_encoder._name_or_path, token=HF_TOKEN)
-
-    if not description:
-        description = (
-            "A female speaker delivers a slightly expressive and animated speech with a moderate speed and pitch. "
-            "The recording is of very high quality, with the speaker's voice sounding clear and very close up."
-        )
 
-    description_input_ids = description_tokenizer(description, return_tensors="pt").to(device)
-    prompt_input_ids = tokenizer(prompt, return_tensors="pt").to(device)
-
-    generation = model.generate(
-        input_ids=description_input_ids.input_ids,
-        attention_mask=description_input_ids.attention_mask,
-        prompt_input_ids=prompt_input_ids.input_ids,
-        prompt_attention_mask=prompt_input_ids.attention_mask
-    )
-    audio_arr = generation.cpu().numpy().squeeze()
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-        sf.write(tmp_file.name, audio_arr, model.config.sampling_rate)
-        audio = AudioSegment.from_wav(tmp_file.name)
-    os.unlink(tmp_file.name)  # Clean up temp file
-    return audio
 
-def main():
-    # Adjust paths based on your directory structure
-    # Assuming script is in the same directory as TaEN_con.csv and Audio folder
-    csv_path = "TaEN_con.csv"
-    audio_dir = "Audio"
-
-    # Set to True to test with first 2 rows, False to process all
-    TEST_MODE = True
-    test_limit = 2
-
-    # Read CSV
-    df = pd.read_csv(csv_path)
-
-    # Add audio_path column if not exists
-    if 'audio_path' not in df.columns:
-        df['audio_path'] = None
-
-    # Determine how many rows to process
-    if TEST_MODE:
-        rows_to_process = df.head(test_limit)
-        print(f"TEST MODE: Processing first {test_limit} rows only.")
-    else:
-        rows_to_process = df
-        print("Processing all rows.")
-
-    total = len(rows_to_process)
-    converted = 0
-    for idx, (index, row) in enumerate(rows_to_process.iterrows(), 1):
-        id_num = row['Id']
-        text = row['conversation_text']
-        audio_path = f"{audio_dir}/{id_num}.mp3"
-
-        print(f"[{idx}/{total}] Starting conversion for ID {id_num}...")
+def _init_worker(threads_per_worker):
+    """Load this worker's own copy of the model before it takes any rows"""
+    import torch
+    _quiet_logging()
+    torch.set_num_threads(threads_per_worker)
+    model = get_model()
+    print(f"[worker {os.getpid()}] Model loaded in {model.load_seconds:.1f}s, warmup {model.warmup_seconds:.1f}s")
+
 
+def _write_atomic(audio, audio_path):
+    """Export to a temp file next to the target, then rename it into place"""
+    tmp_path = f"{audio_path}.{os.getpid()}.tmp"
+    audio.export(tmp_path, format='mp3', bitrate='192k')
+    os.replace(tmp_path, audio_path)
+
+
+def render_batch(batch, audio_dir, batch_size):
+    """Render a list of (Id, text) rows; returns one manifest record per row"""
+    try:
+        audio_arrs, sampling_rate = get_model().generate_batch(
+            [text for _, text in batch], max_batch_size=batch_size
+        )
+    except Exception as e:
+        return [{'Id': id_num, 'status': 'error', 'error': str(e)} for id_num, _ in batch]
+
+    records = []
+    for (id_num, _), audio_arr in zip(batch, audio_arrs):
+        audio_path = os.path.join(audio_dir, f"{id_num}.mp3")
         try:
-            audio = generate_hf_tts_audio(text)
-            audio.export(audio_path, format='mp3', bitrate='192k')
-            df.at[index, 'audio_path'] = audio_path
-            converted += 1
-            print(f"[{idx}/{total}] Success: Saved audio to {audio_path} | Converted: {converted} | Left: {total-converted}")
+            _write_atomic(to_audio_segment(audio_arr, sampling_rate), audio_path)
+            records.append({'Id': id_num, 'status': 'ok', 'audio_path': audio_path})
         except Exception as e:
-            print(f"[{idx}/{total}] Error for ID {id_num}: {e} | Converted: {converted} | Left: {total-converted}")
-            df.at[index, 'audio_path'] = f"Error: {e}"
+            records.append({'Id': id_num, 'status': 'error', 'error': str(e)})
+    return records
+
+
+def load_manifest(manifest_path):
+    """Latest manifest record per Id; rows marked ok with their file present are done"""
+    records = {}
+    if not os.path.exists(manifest_path):
+        return records
+    with open(manifest_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a crash
+            records[str(record['Id'])] = record
+    return records
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render TaEN_con.csv rows to MP3 with Indic Parler-TTS")
+    # Assuming script is run from the directory holding TaEN_con.csv and the Audio folder
+    parser.add_argument('--csv', default="TaEN_con.csv")
+    parser.add_argument('--audio-dir', default="Audio")
+    parser.add_argument('--manifest', default=None, help="defaults to <audio-dir>/manifest.jsonl")
+    parser.add_argument('--output-csv', default="TaEN_con_with_audio.csv")
+    parser.add_argument('--workers', type=int, default=1, help="processes, each with its own model")
+    parser.add_argument('--batch-size', type=int, default=4, help="rows per batched model.generate call")
+    parser.add_argument('--limit', type=int, default=None, help="only the first N rows (e.g. 2 for a test run)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    manifest_path = args.manifest or os.path.join(args.audio_dir, "manifest.jsonl")
+    os.makedirs(args.audio_dir, exist_ok=True)
+
+    df = pd.read_csv(args.csv)
+    if args.limit:
+        df = df.head(args.limit)
+        print(f"Processing first {args.limit} rows only.")
+
+    done = {
+        id_num for id_num, record in load_manifest(manifest_path).items()
+        if record.get('status') == 'ok' and os.path.exists(record['audio_path'])
+    }
+    pending = [(row['Id'], row['conversation_text']) for _, row in df.iterrows() if str(row['Id']) not in done]
+    total = len(pending)
+    print(f"{len(df)} rows, {len(df) - total} already rendered, {total} to go "
+          f"with {args.workers} worker(s), batch size {args.batch_size}")
+
+    batches = [pending[i:i + args.batch_size] for i in range(0, total, args.batch_size)]
+    threads_per_worker = max(1, (os.cpu_count() or 1) // args.workers)
+    converted = failed = 0
+    start = time.time()
+    with open(manifest_path, 'a', encoding='utf-8') as manifest, ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(threads_per_worker,),
+    ) as pool:
+        futures = [pool.submit(render_batch, batch, args.audio_dir, args.batch_size) for batch in batches]
+        for future in as_completed(futures):
+            for record in future.result():
+                # Checkpoint every row so a crash loses at most the batches in flight
+                manifest.write(json.dumps(record, ensure_ascii=False) + "\n")
+                if record['status'] == 'ok':
+                    converted += 1
+                else:
+                    failed += 1
+                    print(f"Error for ID {record['Id']}: {record['error']}")
+            manifest.flush()
+            os.fsync(manifest.fileno())
+
+            finished = converted + failed
+            rate = finished / max(1e-9, time.time() - start) * 60
+            eta_min = (total - finished) / rate if rate else float('inf')
+            print(f"[{finished}/{total}] Converted: {converted} | Failed: {failed} | "
+                  f"{rate:.1f} rows/min | ETA {eta_min:.1f} min")
 
-    # Save updated CSV
     # Create a new CSV with only Id, conversation_text, audio_path
-    new_df = df[['Id', 'conversation_text', 'audio_path']]
-    new_csv_path = "TaEN_con_with_audio.csv"
-    new_df.to_csv(new_csv_path, index=False)
-    print(f"New CSV saved to {new_csv_path}.")
+    records = load_manifest(manifest_path)
+    df['audio_path'] = [
+        records[str(id_num)].get('audio_path') or f"Error: {records[str(id_num)].get('error')}"
+        if str(id_num) in records else None
+        for id_num in df['Id']
+    ]
+    df[['Id', 'conversation_text', 'audio_path']].to_csv(args.output_csv, index=False)
+    print(f"New CSV saved to {args.output_csv}.")
 
-    if TEST_MODE:
-        print("Test completed. Set TEST_MODE = False to process all rows.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,18 +1,24 @@
 from flask import Flask, request, send_file, jsonify
 import tempfile
-import os
+import io
+import zipfile
+
+from assembly import to_audio_segment
+from parler_registry import get_model
 
 app = Flask(__name__)
 
 @app.route('/hf_tts', methods=['POST'])
 def hf_tts_api():
     data = request.form or request.json or {}
+    if request.is_json and isinstance(data.get('texts'), list):
+        return _hf_tts_batch(data['texts'], data.get('description'))
     text = data.get('text')
-    lang = data.get('lang', 'en')
+    description = data.get('description')
     if not text:
         return jsonify({'error': 'No text provided'}), 400
     try:
-        audio = generate_hf_tts_audio(text, lang)
+        audio = generate_hf_tts_audio(text, description)
         with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
             audio.export(tmp_file.name, format='mp3', bitrate='192k')
             tmp_file_path = tmp_file.name
@@ -20,55 +26,37 @@ def hf_tts_api():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _hf_tts_batch(texts, description=None):
+    """Synthesize a JSON list of texts in batches and return a zip of MP3s"""
+    if not texts:
+        return jsonify({'error': 'No texts provided'}), 400
+    try:
+        audio_arrs, sampling_rate = get_model().generate_batch(texts, description)
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w') as archive:
+            for i, audio_arr in enumerate(audio_arrs, 1):
+                mp3 = io.BytesIO()
+                to_audio_segment(audio_arr, sampling_rate).export(mp3, format='mp3', bitrate='192k')
+                archive.writestr(f"{i}.mp3", mp3.getvalue())
+        buf.seek(0)
+        return send_file(buf, as_attachment=True, download_name='tts_output.zip', mimetype='application/zip')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == "__main__":
     import sys
     if len(sys.argv) == 1:
+        # Load and warm the model before serving requests
+        get_model()
         app.run(debug=True, port=5010)
-import os
-import tempfile
-import torch
-import soundfile as sf
-from pydub import AudioSegment
-
-import torch
-from parler_tts import ParlerTTSForConditionalGeneration
-from transformers import AutoTokenizer
-import soundfile as sf
-
-
-HF_TTS_MODEL = "ai4bharat/indic-parler-tts"
-
-def generate_hf_tts_audio(prompt, description=None, temp_dir=None):
+def generate_hf_tts_audio(prompt, description=None):
     """
     Generate audio using ai4bharat/indic-parler-tts from Hugging Face.
+    The model is loaded once per process by parler_registry.
     Returns a pydub.AudioSegment object.
     """
-    hf_token = os.getenv('TTS_HF_TOKEN') or os.getenv('HF_TOKEN')
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    model = ParlerTTSForConditionalGeneration.from_pretrained(HF_TTS_MODEL, token=hf_token).to(device)
-    tokenizer = AutoTokenizer.from_pretrained(HF_TTS_MODEL, token=hf_token)
-    # Use model.config.text_encoder._name_or_path for description tokenizer
-    description_tokenizer = AutoTokenizer.from_pretrained(model.config.text_encoder._name_or_path, token=hf_token)
-
-    if not description:
-        description = "A female speaker delivers a slightly expressive and animated speech with a moderate speed and pitch. The recording is of very high quality, with the speaker's voice sounding clear and very close up."
-
-    description_input_ids = description_tokenizer(description, return_tensors="pt").to(device)
-    prompt_input_ids = tokenizer(prompt, return_tensors="pt").to(device)
-
-    generation = model.generate(
-        input_ids=description_input_ids.input_ids,
-        attention_mask=description_input_ids.attention_mask,
-        prompt_input_ids=prompt_input_ids.input_ids,
-        prompt_attention_mask=prompt_input_ids.attention_mask
-    )
-    audio_arr = generation.cpu().numpy().squeeze()
-    if temp_dir is None:
-        temp_dir = tempfile.gettempdir()
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav', dir=temp_dir) as tmp_file:
-        sf.write(tmp_file.name, audio_arr, model.config.sampling_rate)
-        audio = AudioSegment.from_wav(tmp_file.name)
-    return audio
+    audio_arr, sampling_rate = get_model().generate(prompt, description)
+    return to_audio_segment(audio_arr, sampling_rate)
 
 if __name__ == "__main__":
     import sys
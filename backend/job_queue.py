@@ -0,0 +1,126 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when ``max_depth`` jobs are already waiting"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Job queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    """Fixed pool of worker threads draining a bounded FIFO of async jobs.
+
+    Each worker owns one event loop for its whole life instead of creating
+    a new loop per job; after ``attach_loop`` jobs run on that loop instead
+    (an ASGI server's), with the workers only bounding how many run at
+    once. ``submit`` refuses work once ``max_depth`` jobs are
+    waiting, so a burst of requests turns into 429s rather than an
+    unbounded number of threads and outbound connections. Queue position
+    and wait estimates come from an EWMA of recent job durations.
+    """
+
+    def __init__(self, workers=2, max_depth=50, initial_job_seconds=10.0, alpha=0.2, name='tts-job'):
+        self.workers = max(1, int(workers))
+        self.max_depth = max(0, int(max_depth))
+        self.alpha = alpha
+        self._avg_job_seconds = initial_job_seconds
+        self._pending = deque()
+        self._running = {}
+        self._cond = threading.Condition()
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._shared_loop = None
+        self._threads = [
+            threading.Thread(target=self._worker, name=f'{name}-{i}', daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, job_id, coro_fn, *args):
+        """Queue ``coro_fn(*args)``; raises QueueFull when the queue is at capacity"""
+        with self._cond:
+            if len(self._pending) >= self.max_depth:
+                self._rejected += 1
+                raise QueueFull(self._retry_after_locked())
+            self._pending.append((job_id, coro_fn, args))
+            self._cond.notify()
+
+    def attach_loop(self, loop):
+        """Run jobs started from now on as tasks on ``loop``, which must be running"""
+        self._shared_loop = loop
+
+    def _run(self, loop, coro_fn, args):
+        shared = self._shared_loop
+        if shared is not None and shared.is_running():
+            # The worker thread just waits, holding its slot until the job ends
+            asyncio.run_coroutine_threadsafe(coro_fn(*args), shared).result()
+        else:
+            loop.run_until_complete(coro_fn(*args))
+
+    def _worker(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                job_id, coro_fn, args = self._pending.popleft()
+                self._running[job_id] = time.time()
+            start = time.perf_counter()
+            ok = True
+            try:
+                self._run(loop, coro_fn, args)
+            except Exception as e:
+                # Jobs report their own errors; this only keeps the worker alive
+                ok = False
+                print(f"Job {job_id} failed in worker: {e}")
+            elapsed = time.perf_counter() - start
+            with self._cond:
+                self._running.pop(job_id, None)
+                self._avg_job_seconds += self.alpha * (elapsed - self._avg_job_seconds)
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+    def _wait_for_slot_locked(self, ahead):
+        """Seconds until a job with ``ahead`` jobs queued in front of it starts"""
+        now = time.time()
+        # Time left on the jobs already running, assuming average duration
+        remaining = [max(0.0, self._avg_job_seconds - (now - started)) for started in self._running.values()]
+        # Idle workers are free right away
+        remaining = sorted(remaining + [0.0] * (self.workers - len(remaining)))
+        # Every ``workers`` jobs ahead cost one more average job duration
+        return remaining[ahead % self.workers] + (ahead // self.workers) * self._avg_job_seconds
+
+    def _retry_after_locked(self):
+        return max(1, math.ceil(self._wait_for_slot_locked(len(self._pending))))
+
+    def position(self, job_id):
+        """``(position, estimated_wait_seconds)`` for a queued job, or None once it started"""
+        with self._cond:
+            for i, (queued_id, _, _) in enumerate(self._pending):
+                if queued_id == job_id:
+                    return i + 1, round(self._wait_for_slot_locked(i), 1)
+        return None
+
+    def stats(self):
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'running': len(self._running),
+                'queued': len(self._pending),
+                'max_depth': self.max_depth,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'avg_job_seconds': round(self._avg_job_seconds, 2),
+            }
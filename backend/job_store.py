@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Jobs in these states no longer change and can be garbage collected
+TERMINAL_STATUSES = ('finished', 'error')
+
+
+class JobStore:
+    """Thread-safe job registry bounded by a TTL and a maximum job count.
+
+    Behaves like the plain dict it replaces (``JOBS[job_id] = {...}``,
+    ``JOBS.get(job_id)``). Finished or failed jobs expire ``ttl_seconds``
+    after their last update; when more than ``max_jobs`` are held, the
+    oldest terminal jobs are dropped first. Running jobs are never evicted.
+    """
+
+    def __init__(self, ttl_seconds=3600, max_jobs=1000, on_evict=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max_jobs
+        self.on_evict = on_evict
+        self._jobs = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __setitem__(self, job_id, job):
+        with self._lock:
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            evicted = self._evict_over_capacity()
+        self._notify(evicted)
+
+    def __getitem__(self, job_id):
+        with self._lock:
+            return self._jobs[job_id]
+
+    def __contains__(self, job_id):
+        with self._lock:
+            return job_id in self._jobs
+
+    def __len__(self):
+        with self._lock:
+            return len(self._jobs)
+
+    def get(self, job_id, default=None):
+        with self._lock:
+            return self._jobs.get(job_id, default)
+
+    def pop(self, job_id, default=None):
+        with self._lock:
+            return self._jobs.pop(job_id, default)
+
+    def values(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _evict_over_capacity(self):
+        evicted = []
+        if len(self._jobs) <= self.max_jobs:
+            return evicted
+        for job_id, job in list(self._jobs.items()):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if job.get('status') in TERMINAL_STATUSES:
+                evicted.append((job_id, self._jobs.pop(job_id)))
+        return evicted
+
+    def sweep(self, now=None):
+        """Drop expired terminal jobs and return them as (job_id, job) pairs"""
+        now = now or time.time()
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.get('status') in TERMINAL_STATUSES
+                and now - job.get('updated', now) > self.ttl_seconds
+            ]
+            evicted = [(job_id, self._jobs.pop(job_id)) for job_id in expired]
+            evicted.extend(self._evict_over_capacity())
+        self._notify(evicted)
+        return evicted
+
+    def _notify(self, evicted):
+        if self.on_evict:
+            for job_id, job in evicted:
+                self.on_evict(job_id, job)
+
+
+def remove_orphaned_files(directory, keep_paths, max_age_seconds, now=None):
+    """Delete files in ``directory`` older than ``max_age_seconds`` not in ``keep_paths``"""
+    now = now or time.time()
+    removed = 0
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return removed
+    for name in names:
+        path = os.path.join(directory, name)
+        if path in keep_paths:
+            continue
+        try:
+            if os.path.isfile(path) and now - os.path.getmtime(path) > max_age_seconds:
+                os.unlink(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
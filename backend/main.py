@@ -1,56 +1,41 @@
-from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
-import torch
-import soundfile as sf
-# Add Hugging Face model config
-HF_TTS_MODEL = "ai4bharat/indic-parler-tts"
-HF_TTS_LANGS = {
-    'ta': 'ta',
-    'en': 'en',
-}
-
-# Load model and processor globally (lazy init)
-hf_tts_model = None
-hf_tts_processor = None
-hf_tts_pipe = None
-
-def generate_hf_tts_audio(text, lang='en'):
-    """Generate audio using ai4bharat/indic-parler-tts from Hugging Face"""
-    global hf_tts_model, hf_tts_processor, hf_tts_pipe
-    if hf_tts_model is None or hf_tts_processor is None or hf_tts_pipe is None:
-        hf_tts_model = AutoModelForSpeechSeq2Seq.from_pretrained(HF_TTS_MODEL)
-        hf_tts_processor = AutoProcessor.from_pretrained(HF_TTS_MODEL)
-        hf_tts_pipe = pipeline(
-            "text-to-speech",
-            model=hf_tts_model,
-            tokenizer=hf_tts_processor,
-            feature_extractor=hf_tts_processor,
-            device=0 if torch.cuda.is_available() else -1
-        )
-    lang_code = HF_TTS_LANGS.get(lang, 'en')
-    # The pipeline expects a dict with 'text' and 'lang'
-    result = hf_tts_pipe({"text": text, "lang": lang_code})
-    # Save to temp wav file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav', dir=TEMP_DIR) as tmp_file:
-        sf.write(tmp_file.name, result["audio"], result["sampling_rate"])
-        audio = AudioSegment.from_wav(tmp_file.name)
-    return audio, 'hf-tts'
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
+from werkzeug.serving import WSGIRequestHandler
 from gtts import gTTS
 import edge_tts
 import asyncio
+import contextvars
 import os
+import re
 import tempfile
 import json
-from langdetect import detect, LangDetectException
-from pydub import AudioSegment
+import soundfile as sf
 from pydub.silence import detect_silence
-import docx
 import io
-import re
 import uuid
 import threading
 import time
+import queue
+import numpy as np
+from segment_cache import (
+    DEFAULT_CACHE_DIR, DEFAULT_PARAGRAPH_CACHE_DIR, DEFAULT_RESULT_CACHE_DIR, SegmentCache, make_key, make_result_key,
+)
+from synthesis import SynthesisPool, slot_wait
+from assembly import CANONICAL_RATE, assemble, decode, decode_pcm, speed_up, to_canonical
+from job_store import TERMINAL_STATUSES, JobStore, remove_orphaned_files
+from job_queue import JobQueue, QueueFull
+from progress_events import ProgressBroker, format_sse
+from segmenter import split_mixed_text
+from planner import DEFAULT_POLICY, plan_segments
+from edge_ssml import WSS_URL, build_ssml, synthesize_ssml
+from engine_router import EngineRouter, round_trip
+from engines import AsyncEngine, BlockingEngine, EngineRegistry, OfflineEngine, builtin_capabilities
+from encoder import OUTPUT_FORMATS, STREAMABLE_FORMATS, encode, encode_to_file, resolve_format
+from document_source import DocumentSource
+from pcm_spool import PcmSpool
+from metrics import StageMetrics, current_job
+import parler_registry
+from parler_registry import HF_TTS_MODEL, PARLER_PROFILE, effective_profile
 
 app = Flask(__name__)
 CORS(app)
@@ -58,16 +43,119 @@ CORS(app)
 # Create temp directory for audio files
 TEMP_DIR = tempfile.mkdtemp()
 
-# In-memory job progress tracking
-JOBS = {}
+# Finished jobs and temp files are garbage collected after this long
+JOB_TTL_SECONDS = int(os.getenv('TTS_JOB_TTL_SECONDS', '3600'))
+MAX_JOBS = int(os.getenv('TTS_MAX_JOBS', '1000'))
+SWEEP_INTERVAL_SECONDS = 60
+
+# /convert_async jobs run on a fixed worker pool; beyond the queue depth requests get 429
+JOB_WORKERS = int(os.getenv('TTS_JOB_WORKERS', '2'))
+JOB_QUEUE_DEPTH = int(os.getenv('TTS_JOB_QUEUE_DEPTH', '50'))
+
+def _delete_job_output(job_id, job):
+    if job.get('output_path'):
+        _remove_file(job['output_path'])
+        _remove_file(manifest_path(job['output_path']))
+
+# In-memory job progress tracking, bounded by TTL and job count
+JOBS = JobStore(ttl_seconds=JOB_TTL_SECONDS, max_jobs=MAX_JOBS, on_evict=_delete_job_output)
+
+_STAGES_LOCK = threading.Lock()
+
+def _record_job_stage(job_id, stage, seconds, labels, details):
+    """Add a timed span to the job's per-stage breakdown shown in /progress"""
+    job = JOBS.get(job_id) if job_id else None
+    if job is None:
+        return
+    # Synthesis is broken down per engine
+    key = f"{stage}:{labels['engine']}" if 'engine' in labels else stage
+    with _STAGES_LOCK:
+        entry = job.setdefault('stages', {}).setdefault(key, {'seconds': 0.0, 'count': 0})
+        entry['seconds'] = round(entry['seconds'] + seconds, 4)
+        entry['count'] += 1
+        for name, value in details.items():
+            entry[name] = entry.get(name, 0) + value
+
+# Timing histograms per pipeline stage, served on /metrics
+METRICS = StageMetrics(on_span=_record_job_stage)
+
+# Pushes job updates to /progress/<job_id>/events subscribers
+PROGRESS_EVENTS = ProgressBroker()
+# Comment line sent on idle SSE connections so proxies keep them open
+SSE_KEEPALIVE_SECONDS = 15
 
 # TTS engine configuration priority: gtts > edge (gTTS is faster for most cases)
 TTS_CONFIG = {
-    'preferred_engine': os.getenv('TTS_ENGINE', 'gtts'),  # gtts, edge, auto
+    'preferred_engine': os.getenv('TTS_ENGINE', 'gtts'),  # gtts, edge, hf-tts, offline, auto
+    # Threads available for blocking engine calls, shared by all jobs
+    'synthesis_workers': int(os.getenv('TTS_SYNTH_WORKERS', '16')),
+    # Max in-flight requests per engine across all jobs
+    'engine_concurrency': {
+        'gtts': int(os.getenv('TTS_GTTS_CONCURRENCY', '8')),
+        'edge': int(os.getenv('TTS_EDGE_CONCURRENCY', '4')),
+        'hf-tts': int(os.getenv('TTS_HF_CONCURRENCY', '1')),
+        'offline': int(os.getenv('TTS_OFFLINE_CONCURRENCY', '32')),
+    },
+    # Simulated round trip of the offline load-testing engine
+    'offline_latency_ms': int(os.getenv('TTS_OFFLINE_LATENCY_MS', '0')),
+    # Output assembly: canonical sample rate, silence on language switch, crossfade otherwise
+    'sample_rate': CANONICAL_RATE,
+    'switch_gap_ms': 5,
+    'crossfade_ms': 0,
+    # Final audio is sped up by this factor without changing pitch
+    'playback_speed': 1.25,
+    # Documents render this many characters of whole paragraphs at a time; finished
+    # chunks are spooled to disk, so memory does not grow with document length
+    'render_chunk_chars': int(os.getenv('TTS_RENDER_CHUNK_CHARS', '5000')),
+    # Ask langdetect about Latin-script runs the Tanglish lexicon cannot resolve
+    'langdetect_latin_runs': os.getenv('TTS_LANGDETECT_LATIN_RUNS', '0') == '1',
+    # Segment planner: merge short fragments into fewer, larger engine requests
+    'planner': dict(DEFAULT_POLICY, enabled=os.getenv('TTS_PLANNER', '1') == '1'),
+    # Edge only: read a run of segments as one multi-voice SSML request instead of one per segment
+    'edge_multivoice': os.getenv('TTS_EDGE_MULTIVOICE', '0') == '1',
+    'edge_multivoice_max_chars': 2000,
+    'edge_wss_url': os.getenv('TTS_EDGE_WSS_URL', WSS_URL),
+    # Engine routing: circuit breaker per engine, hedge to the next engine past this latency percentile
+    'breaker_failures': int(os.getenv('TTS_BREAKER_FAILURES', '3')),
+    'breaker_open_seconds': int(os.getenv('TTS_BREAKER_OPEN_SECONDS', '30')),
+    'hedge_requests': os.getenv('TTS_HEDGE_REQUESTS', '1') == '1',
+    'hedge_percentile': float(os.getenv('TTS_HEDGE_PERCENTILE', '0.9')),
+    # Output format when the request does not pass ?format= (mp3, opus, wav, pcm)
+    'output_format': resolve_format(os.getenv('TTS_OUTPUT_FORMAT', 'mp3')) or 'mp3',
 }
 
-# Cache for language detection to avoid redundant detections
-LANG_DETECT_CACHE = {}
+# Bounded background job queue, one persistent event loop per worker
+JOB_QUEUE = JobQueue(workers=JOB_WORKERS, max_depth=JOB_QUEUE_DEPTH)
+
+# Executor-backed synthesis layer so segments render concurrently
+SYNTH_POOL = SynthesisPool(TTS_CONFIG['synthesis_workers'], TTS_CONFIG['engine_concurrency'])
+
+# Orders engines per request by observed latency and health
+ENGINE_ROUTER = EngineRouter(
+    failure_threshold=TTS_CONFIG['breaker_failures'],
+    open_seconds=TTS_CONFIG['breaker_open_seconds'],
+    hedge=TTS_CONFIG['hedge_requests'],
+    hedge_percentile=TTS_CONFIG['hedge_percentile'],
+)
+
+# On-disk cache of synthesized segment audio, keyed by text/lang/engine/voice/rate
+SEGMENT_CACHE = SegmentCache(
+    cache_dir=os.getenv('TTS_CACHE_DIR', DEFAULT_CACHE_DIR),
+    max_bytes=int(os.getenv('TTS_CACHE_MAX_MB', '512')) * 1024 * 1024,
+)
+
+# On-disk cache of finished documents, keyed by normalized text and render settings
+RESULT_CACHE = SegmentCache(
+    cache_dir=os.getenv('TTS_RESULT_CACHE_DIR', DEFAULT_RESULT_CACHE_DIR),
+    max_bytes=int(os.getenv('TTS_RESULT_CACHE_MAX_MB', '256')) * 1024 * 1024,
+)
+
+# Rendered (sped-up) PCM per paragraph, so re-converting an edited document
+# only synthesizes the paragraphs that changed
+PARAGRAPH_CACHE = SegmentCache(
+    cache_dir=os.getenv('TTS_PARAGRAPH_CACHE_DIR', DEFAULT_PARAGRAPH_CACHE_DIR),
+    max_bytes=int(os.getenv('TTS_PARAGRAPH_CACHE_MAX_MB', '1024')) * 1024 * 1024,
+)
 
 # Edge TTS voices - Free, good quality
 EDGE_VOICES = {
@@ -75,16 +163,41 @@ EDGE_VOICES = {
     'en': 'en-IN-NeerjaNeural',
 }
 
-def _init_job(job_id: str):
+# Edge TTS speaking rates - slightly faster playback for both languages
+EDGE_RATES = {
+    'ta': '-2%',
+    'en': '+5%',
+}
+
+def _init_job(job_id: str, output_format: str = 'mp3', result_key: str = None, source_path: str = None):
     JOBS[job_id] = {
         'status': 'queued',
+        'output_format': output_format,
+        'result_key': result_key,
         'percent': 0,
         'message': 'Queued',
+        'source_path': source_path,
         'output_path': None,
         'error': None,
+        'stages': {},
         'updated': time.time(),
     }
 
+def _job_snapshot(job_id: str, job: dict):
+    """Client-facing view of a job, as served by /progress"""
+    # Worker threads keep updating the job and its stage breakdown; serialize a copy
+    with _STAGES_LOCK:
+        job = dict(job)
+        if 'stages' in job:
+            job['stages'] = {name: dict(entry) for name, entry in job['stages'].items()}
+    # Do not expose internal paths
+    result = {k: v for k, v in job.items() if k not in ('output_path', 'source_path')}
+    if job.get('status') == 'queued':
+        queued = JOB_QUEUE.position(job_id)
+        if queued:
+            result['queue_position'], result['estimated_wait_seconds'] = queued
+    return result
+
 def _set_progress(job_id: str, percent: int, message: str = None):
     job = JOBS.get(job_id)
     if not job:
@@ -93,6 +206,7 @@ def _set_progress(job_id: str, percent: int, message: str = None):
     if message is not None:
         job['message'] = message
     job['updated'] = time.time()
+    PROGRESS_EVENTS.publish(job_id, _job_snapshot(job_id, job))
 
 def _set_status(job_id: str, status: str, message: str = None):
     job = JOBS.get(job_id)
@@ -102,192 +216,185 @@ def _set_status(job_id: str, status: str, message: str = None):
     if message is not None:
         job['message'] = message
     job['updated'] = time.time()
+    PROGRESS_EVENTS.publish(job_id, _job_snapshot(job_id, job))
 
-def extract_text_from_docx(file_stream):
-    """Extract text from DOCX file"""
-    doc = docx.Document(io.BytesIO(file_stream.read()))
-    full_text = []
-    for paragraph in doc.paragraphs:
-        full_text.append(paragraph.text)
-    return '\n'.join(full_text)
-
-# Common Tamil words written in English (Tanglish)
-TANGLISH_WORDS = {
-    'romba', 'nalla', 'enna', 'epdi', 'enga', 'inga', 'anga', 'ippo', 'appo',
-    'thaan', 'than', 'illa', 'illai', 'iruku', 'irukku', 'iruken', 'irukken',
-    'panna', 'pannunga', 'sollu', 'sollungo', 'vaanga', 'ponga', 'vanga',
-    'aamam', 'aama', 'seri', 'sariya', 'konjam', 'koncham', 'kastam',
-    'bore', 'adikkudhu', 'adikuthu', 'podhu', 'pothum', 'venum', 'vendum',
-    'theriyum', 'therla', 'theriyala', 'puriyala', 'puriyuthu', 'mudiala',
-    'mudiyum', 'mudiyathu', 'paravala', 'parava', 'nandri', 'vanakkam',
-    'poi', 'vaa', 'va', 'pa', 'da', 'di', 'ma', 'ya', 'ya', 'la', 'le',
-    'kku', 'ku', 'thala', 'anna', 'akka', 'amma', 'appa', 'thangachi',
-    'thambi', 'macha', 'machan', 'machaan', 'nanba', 'nanban', 'dei', 'dey',
-    'apdiya', 'apdi', 'ipdiya', 'ipdi', 'yenda', 'yenada', 'yen', 'yaar',
-    'evlo', 'evalavu', 'etna', 'ethana', 'eppadi', 'yepdi', 'yenge', 'enga',
-    'kaasu', 'panam', 'velai', 'vela', 'venum', 'venaam', 'thevai',
-    'saptu', 'sapadu', 'saapdu', 'kudikka', 'kudicha', 'poyiten', 'vandhuten',
-    'solluren', 'keluren', 'parkuren', 'paakuren', 'poren', 'poidren',
-    'super', 'mass', 'thara', 'level', 'mokka', 'jolly', 'cool', 'vera',
-    'ooru', 'oor', 'veedu', 'veetu', 'kadai', 'office', 'school', 'college',
-    'friend', 'friends', 'guys', 'bro', 'bha', 'ji'
-}
+def _sweep_expired():
+    """Drop expired jobs with their outputs, then any orphaned temp files"""
+    expired = JOBS.sweep()
+    live_paths = {job[key] for job in JOBS.values() for key in ('output_path', 'source_path') if job.get(key)}
+    live_paths |= {manifest_path(path) for path in live_paths}
+    orphans = remove_orphaned_files(TEMP_DIR, live_paths, JOB_TTL_SECONDS)
+    if expired or orphans:
+        print(f"Sweeper: removed {len(expired)} expired jobs, {orphans} orphaned files")
 
-def detect_language(text):
-    """Detect if text is Tamil or English with Tanglish support (cached)"""
-    text_lower = text.lower().strip()
-    
-    # Check cache first
-    if text_lower in LANG_DETECT_CACHE:
-        return LANG_DETECT_CACHE[text_lower]
-    
-    try:
-        # Check for Tamil Unicode characters
-        tamil_chars = re.findall(r'[\u0B80-\u0BFF]', text)
-        if tamil_chars:
-            result = 'ta'
-        else:
-            # Check if it's a known Tanglish word
-            word_clean = re.sub(r'[^\w]', '', text_lower)
-            if word_clean in TANGLISH_WORDS:
-                result = 'ta-en'  # Tanglish - Tamil word in English script
-            # For short texts, default to English
-            elif len(text.strip()) < 3:
-                result = 'en'
-            else:
-                result = detect(text)
-        
-        # Cache the result
-        LANG_DETECT_CACHE[text_lower] = result
-        return result
-    except LangDetectException:
-        result = 'en'
-        LANG_DETECT_CACHE[text_lower] = result
-        return result
-
-def split_mixed_text(text):
-    """Split text into segments based on language"""
-    # Split by sentences while preserving punctuation
-    sentences = re.split(r'([.!?]+[\s]*)', text)
-    
-    # Reconstruct sentences with their punctuation
-    reconstructed = []
-    i = 0
-    while i < len(sentences):
-        if i + 1 < len(sentences) and re.match(r'[.!?]+[\s]*', sentences[i+1]):
-            reconstructed.append(sentences[i] + sentences[i+1])
-            i += 2
-        else:
-            if sentences[i].strip():
-                reconstructed.append(sentences[i])
-            i += 1
-    
-    segments = []
-    for sentence in reconstructed:
-        if not sentence.strip():
-            continue
-            
-        # Further split by language boundaries within sentence
-        current_segment = ""
-        current_lang = None
-        
-        words = sentence.split()
-        for word in words:
-            word_lang = detect_language(word)
-            
-            # Normalize language (treat ta-en as ta for grouping)
-            normalized_lang = 'ta' if word_lang in ['ta', 'ta-en'] else 'en'
-            
-            if current_lang is None:
-                current_lang = normalized_lang
-                current_segment = word
-            elif current_lang == normalized_lang:
-                current_segment += " " + word
-            else:
-                # Language change detected
-                if current_segment.strip():
-                    segments.append((current_segment.strip(), current_lang))
-                current_lang = normalized_lang
-                current_segment = word
-        
-        if current_segment.strip():
-            segments.append((current_segment.strip(), current_lang))
-    
-    return segments
+def _sweeper_loop():
+    while True:
+        time.sleep(SWEEP_INTERVAL_SECONDS)
+        try:
+            _sweep_expired()
+        except Exception as e:
+            print(f"Sweeper error: {e}")
+
+threading.Thread(target=_sweeper_loop, name='job-sweeper', daemon=True).start()
 
 # ============================================================================
 # TTS ENGINE IMPLEMENTATIONS
 # ============================================================================
 
+def _decode(data, fmt=None):
+    """assembly.decode, timed as the decode stage"""
+    with METRICS.span('decode'):
+        return decode(data, fmt)
+
+def _remove_file(path):
+    """Delete a temp file, ignoring files that are already gone"""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+def _cached_segment(cache_key):
+    """Decoded audio of a cached segment, or None"""
+    cached = SEGMENT_CACHE.get(cache_key)
+    return _decode(*cached) if cached else None
+
+def _decode_and_cache(cache_key, data, fmt):
+    """Decode freshly synthesized audio and store it in the segment cache"""
+    audio = _decode(data, fmt)
+    SEGMENT_CACHE.put(cache_key, data, fmt)
+    return audio
+
 async def generate_edge_audio(text, lang='en'):
     """Generate audio using Edge TTS (Free, Good Quality)"""
     try:
         voice = EDGE_VOICES[lang]
-        # Slightly faster playback for both languages
-        rate = "-2%" if lang == 'ta' else "+5%"
+        rate = EDGE_RATES[lang]
+        cache_key = make_key(text, lang, 'edge', voice, rate)
+        # Decoding and cache file I/O run off the event loop, which other requests may share
+        audio = await asyncio.to_thread(_cached_segment, cache_key)
+        if audio is not None:
+            return audio, 'edge'
         
         communicate = edge_tts.Communicate(text, voice, rate=rate)
+        # Collect the MP3 stream in memory instead of saving it to a temp file
+        data = bytearray()
+        with round_trip():
+            async for chunk in communicate.stream():
+                if chunk['type'] == 'audio':
+                    data.extend(chunk['data'])
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3', dir=TEMP_DIR) as tmp_file:
-            tmp_path = tmp_file.name
-            await communicate.save(tmp_path)
-        
-        audio = AudioSegment.from_mp3(tmp_path)
+        audio = await asyncio.to_thread(_decode_and_cache, cache_key, bytes(data), 'mp3')
         return audio, 'edge'
     
     except Exception as e:
         print(f"Edge TTS error: {e}")
         return None, None
 
+async def generate_edge_multivoice_audio(segments):
+    """Read several (text, lang) segments in one Edge request, switching voices in SSML"""
+    ssml = build_ssml(segments, EDGE_VOICES, EDGE_RATES)
+    # Voices and rates are part of the SSML, so the document alone is the key
+    cache_key = make_key(ssml, 'multi', 'edge-ssml')
+    audio = await asyncio.to_thread(_cached_segment, cache_key)
+    if audio is not None:
+        return audio
+    data = await synthesize_ssml(ssml, TTS_CONFIG['edge_wss_url'])
+    return await asyncio.to_thread(_decode_and_cache, cache_key, data, 'mp3')
+
+def generate_hf_tts_audio(text, lang='en'):
+    """Generate audio using ai4bharat/indic-parler-tts from the shared model registry"""
+    # Indic Parler-TTS picks the language from the prompt text itself
+    model = parler_registry.get_model()
+    # int8/bf16 inference sounds slightly different from fp32, so the profile the model
+    # actually runs (after any fallback) is part of the key
+    cache_key = make_key(text, lang, 'hf-tts', f"{HF_TTS_MODEL}:{model.profile}")
+    cached = SEGMENT_CACHE.get(cache_key)
+    if cached:
+        return _decode(*cached), 'hf-tts'
+    with round_trip():
+        audio_arr, sampling_rate = model.generate(text)
+    buf = io.BytesIO()
+    sf.write(buf, audio_arr, sampling_rate, format='WAV')
+    SEGMENT_CACHE.put(cache_key, buf.getvalue(), 'wav')
+    # The array goes straight to the assembler
+    return (audio_arr, sampling_rate), 'hf-tts'
+
 def generate_gtts_audio(text, lang='en'):
     """Generate audio using gTTS (Fallback, Basic Quality)"""
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3', dir=TEMP_DIR) as tmp_file:
-            tmp_path = tmp_file.name
-            # Use faster speed for all languages
-            tts = gTTS(text=text, lang=lang, slow=False)
-            tts.save(tmp_path)
+        cache_key = make_key(text, lang, 'gtts', lang, 'normal')
+        cached = SEGMENT_CACHE.get(cache_key)
+        if cached:
+            return _decode(*cached), 'gtts'
+        # Use faster speed for all languages
+        tts = gTTS(text=text, lang=lang, slow=False)
+        buf = io.BytesIO()
+        with round_trip():
+            tts.write_to_fp(buf)
+        data = buf.getvalue()
         
-        audio = AudioSegment.from_mp3(tmp_path)
+        audio = _decode(data, 'mp3')
+        SEGMENT_CACHE.put(cache_key, data, 'mp3')
         return audio, 'gtts'
     
     except Exception as e:
         print(f"gTTS error: {e}")
         return None, None
 
-async def generate_audio_smart(text, lang='en'):
-    """Smart audio generation with automatic fallback cascade"""
-    engines_tried = []
-    
-    # Determine engine priority based on config
+# Every engine with what it can do; request sizes and per-engine parallelism come from here
+ENGINES = EngineRegistry()
+ENGINES.register(BlockingEngine(
+    'gtts', builtin_capabilities('gtts', TTS_CONFIG['engine_concurrency']['gtts']), SYNTH_POOL, generate_gtts_audio,
+))
+ENGINES.register(AsyncEngine(
+    'edge', builtin_capabilities('edge', TTS_CONFIG['engine_concurrency']['edge']), SYNTH_POOL, generate_edge_audio,
+))
+ENGINES.register(BlockingEngine(
+    'hf-tts', builtin_capabilities('hf-tts', TTS_CONFIG['engine_concurrency']['hf-tts']), SYNTH_POOL,
+    generate_hf_tts_audio,
+))
+# Deterministic local audio for load tests: TTS_ENGINE=offline
+ENGINES.register(OfflineEngine(
+    SYNTH_POOL, latency=TTS_CONFIG['offline_latency_ms'] / 1000,
+    concurrency=TTS_CONFIG['engine_concurrency']['offline'],
+))
+
+# Fallback order when the engine is 'auto'; the router reorders by observed latency
+AUTO_ENGINES = ['hf-tts', 'gtts', 'edge']
+
+def _candidate_engines(lang=None):
+    """Engines to try for ``lang``: those configured that can voice it"""
     preferred = TTS_CONFIG['preferred_engine']
-    
-    # Try Hugging Face TTS first if set
-    if preferred in ['hf-tts', 'auto']:
+    names = AUTO_ENGINES if preferred == 'auto' else [preferred]
+    if lang is None:
+        return names
+    # Nothing declares the language: let the configured engines try anyway
+    return ENGINES.candidates(names, lang) or names
+
+async def _timed_synthesis(call, chars, engine, lang):
+    """Await an engine call, timed as synthesis apart from its wait for an engine slot"""
+    start = time.perf_counter()
+    with slot_wait() as waited:
         try:
-            audio, engine = generate_hf_tts_audio(text, lang)
-            if audio:
-                print(f"✓ Generated with HF TTS ({lang})")
-                return audio, engine
-            engines_tried.append('hf-tts')
-        except Exception as e:
-            print(f"HF TTS error: {e}")
-            engines_tried.append('hf-tts')
-    # Try gTTS
-    if preferred in ['gtts', 'auto']:
-        audio, engine = generate_gtts_audio(text, lang)
-        if audio:
-            print(f"✓ Generated with gTTS ({lang})")
-            return audio, engine
-        engines_tried.append('gtts')
-    # Fallback to Edge TTS
-    if preferred in ['edge', 'auto']:
-        audio, engine = await generate_edge_audio(text, lang)
-        if audio:
-            print(f"✓ Generated with Edge TTS ({lang})")
-            return audio, engine
-        engines_tried.append('edge')
-    raise Exception(f"All TTS engines failed. Tried: {', '.join(engines_tried)}")
+            return await call
+        finally:
+            seconds = time.perf_counter() - start
+            METRICS.record('slot_wait', waited['seconds'], engine=engine)
+            METRICS.record('synthesis', seconds - waited['seconds'], {'chars': chars}, engine=engine, lang=lang)
+
+async def _run_engine(engine, text, lang):
+    """Run one registered engine; returns (audio, engine) or (None, None)"""
+    METRICS.count('synthesis_chars_total', len(text), engine=engine, lang=lang)
+    audio = await _timed_synthesis(ENGINES.get(engine).synthesize(text, lang), len(text), engine, lang)
+    return (audio, engine) if audio is not None else (None, None)
+
+async def generate_audio_smart(text, lang='en'):
+    """Smart audio generation: healthiest, fastest engine first, with fallback and hedging"""
+    audio, engine = await ENGINE_ROUTER.call(
+        _candidate_engines(lang), lambda engine: _run_engine(engine, text, lang)
+    )
+    print(f"✓ Generated with {engine} ({lang})")
+    return audio, engine
 
 async def generate_english_audio(text):
     """Generate English audio with smart engine selection"""
@@ -303,205 +410,800 @@ async def generate_tamil_audio(text):
 # MAIN TTS PROCESSING
 # ============================================================================
 
-async def process_text_to_speech(text, job_id: str = None):
-    """Main function to process text and generate mixed-language audio"""
-    print(f"Processing text: {text[:100]}...")
-    
-    # Split text into language segments
-    if job_id:
-        _set_progress(job_id, 5, 'Splitting text into segments')
-    segments = split_mixed_text(text)
-    print(f"Detected {len(segments)} segments")
-    if job_id:
-        _set_progress(job_id, 10, f'Detected {len(segments)} segments')
-    
-    total = max(1, len(segments))
+def _max_request_chars():
+    """Request size cap every engine the current configuration may use accepts"""
+    return ENGINES.max_request_chars(_candidate_engines())
+
+def plan_text(text):
+    """Split text into language segments and plan them into engine requests"""
+    with METRICS.span('segmentation') as span:
+        span['chars'] = len(text)
+        segments = split_mixed_text(text, TTS_CONFIG['langdetect_latin_runs'])
+        if not TTS_CONFIG['planner']['enabled']:
+            return segments
+        planned, stats = plan_segments(segments, TTS_CONFIG['planner'], _max_request_chars())
+    print(f"Planner: {stats['segments_in']} fragments -> {stats['segments_out']} requests "
+          f"(est. {stats['estimated_cost_ms_before']} ms -> {stats['estimated_cost_ms_after']} ms)")
+    return planned
+
+# Indices of failed segments in the current render task; their silence must never be cached
+_failed_segments = contextvars.ContextVar('tts_failed_segments', default=None)
+
+async def _synthesize_segment(i, segment_text, lang):
+    """Synthesize one segment, substituting a second of silence on failure"""
+    print(f"Segment {i+1}: {lang} - {segment_text[:50]}...")
+    try:
+        if lang == 'ta':  # Tamil
+            return await generate_tamil_audio(segment_text)
+        return await generate_english_audio(segment_text)  # English
+    except Exception as e:
+        print(f"Error processing segment {i+1}: {e}")
+        failures = _failed_segments.get()
+        if failures is not None:
+            failures.append(i)
+        rate = TTS_CONFIG['sample_rate']
+        return np.zeros(rate, dtype=np.float32), rate
+
+_SENTENCE_END_RE = re.compile(r'[.!?]\s*$')
+
+def group_requests(segments):
+    """Group segments into engine requests: sentences for multi-voice Edge, otherwise one each"""
+    if not (TTS_CONFIG['edge_multivoice'] and TTS_CONFIG['preferred_engine'] == 'edge'):
+        return [[segment] for segment in segments]
+    max_chars = TTS_CONFIG['edge_multivoice_max_chars']
+    groups = []
+    closed = True
+    for segment in segments:
+        if not closed and sum(len(t) for t, _ in groups[-1]) + len(segment[0]) <= max_chars:
+            groups[-1].append(segment)
+        else:
+            groups.append([segment])
+        # A group ends with its sentence so streaming can still start early
+        closed = bool(_SENTENCE_END_RE.search(segment[0]))
+    return groups
+
+def _switch_gaps(groups):
+    """Silence between consecutive groups: a short gap only where the language changes"""
+    return [
+        TTS_CONFIG['switch_gap_ms'] if groups[i - 1][-1][1] != groups[i][0][1] else 0
+        for i in range(1, len(groups))
+    ]
+
+async def _synthesize_group(i, group):
+    """Synthesize one request group; multi-voice groups fall back to one request per segment"""
+    if len(group) == 1:
+        return await _synthesize_segment(i, *group[0])
+    print(f"Group {i+1}: {len(group)} segments in one multi-voice Edge request")
+    try:
+        return await _timed_synthesis(
+            SYNTH_POOL.run_async('edge', generate_edge_multivoice_audio, group),
+            sum(len(text) for text, _ in group), 'edge-ssml', 'multi',
+        )
+    except Exception as e:
+        print(f"Multi-voice Edge request failed, falling back to per-segment: {e}")
+    audio_segments = await asyncio.gather(*[_synthesize_segment(i, text, lang) for text, lang in group])
+    rate = TTS_CONFIG['sample_rate']
+    # Not a combine span of its own: combine is timed once per paragraph
+    clips = [to_canonical(audio, rate) for audio in audio_segments]
+    combined = assemble(clips, _switch_gaps([[segment] for segment in group]), TTS_CONFIG['crossfade_ms'], rate)
+    return combined, rate
+
+def _speed_up(samples):
+    """Speed audio up by the configured playback speed without changing pitch"""
+    with METRICS.span('speedup'):
+        return speed_up(samples, TTS_CONFIG['sample_rate'], TTS_CONFIG['playback_speed'])
+
+def _render_settings():
+    """Every setting besides the text and output format that changes the rendered audio"""
+    return {
+        'engine': TTS_CONFIG['preferred_engine'],
+        'edge_voices': EDGE_VOICES,
+        'edge_rates': EDGE_RATES,
+        'edge_multivoice': TTS_CONFIG['edge_multivoice'],
+        'hf_model': HF_TTS_MODEL,
+        # Resolved the way get_model() resolves it, without loading the model
+        'hf_profile': effective_profile(PARLER_PROFILE) if 'hf-tts' in _candidate_engines() else None,
+        'sample_rate': TTS_CONFIG['sample_rate'],
+        'switch_gap_ms': TTS_CONFIG['switch_gap_ms'],
+        'crossfade_ms': TTS_CONFIG['crossfade_ms'],
+        'playback_speed': TTS_CONFIG['playback_speed'],
+        'langdetect_latin_runs': TTS_CONFIG['langdetect_latin_runs'],
+        'planner': TTS_CONFIG['planner'],
+        'max_request_chars': _max_request_chars(),
+    }
+
+def result_key(source, output_format):
+    """Result cache key: normalized text plus the render settings and output format"""
+    settings = dict(_render_settings(), format=output_format)
+    return make_result_key((paragraph for paragraph, _ in source.paragraphs()), settings)
+
+def manifest_path(output_path):
+    """Where the paragraph manifest of an output file is written"""
+    return os.path.splitext(output_path)[0] + '.manifest.json'
+
+def _store_result(key, output_path, output_format):
+    """Copy a finished output into the result cache so identical requests skip rendering"""
+    try:
+        RESULT_CACHE.put_file(key, output_path, OUTPUT_FORMATS[output_format]['extension'])
+        RESULT_CACHE.put_file(f"{key}-manifest", manifest_path(output_path), 'json')
+    except OSError as e:
+        print(f"Result cache write error: {e}")
+
+async def _render_chunk(paragraphs, on_segment=None):
+    """Render one chunk of paragraphs, reusing any paragraph rendered before.
+
+    Returns one entry per paragraph, None for paragraphs without speech:
+    ``{'hash', 'samples', 'first_lang', 'last_lang', 'reused', 'failed'}``,
+    with the samples already sped up. Only paragraphs missing from the
+    paragraph cache are synthesized, all of their requests in parallel;
+    ``failed`` paragraphs contain silence for a segment that failed and
+    are not cached.
+    """
+    settings = _render_settings()
+    planned = [group_requests(plan_text(paragraph)) for paragraph in paragraphs]
+    entries = []
+    todo = []
+    for groups, paragraph in zip(planned, paragraphs):
+        if not groups:
+            entries.append(None)
+            continue
+        key = make_result_key([paragraph], settings)
+        cached = PARAGRAPH_CACHE.get(key)
+        samples = decode_pcm(cached[0]) if cached else None
+        entries.append({
+            'hash': key, 'samples': samples,
+            'first_lang': groups[0][0][1], 'last_lang': groups[-1][-1][1], 'reused': cached is not None,
+            'failed': False,
+        })
+        if not cached:
+            todo.extend((len(entries) - 1, group) for group in groups)
+    print(f"Rendering {sum(1 for e in entries if e and not e['reused'])} paragraphs, "
+          f"reusing {sum(1 for e in entries if e and e['reused'])}")
+    total = len(todo)
+    # Segments finish out of order, so progress counts completions rather than indices
+    completed = 0
     
     # Generate audio for all segments in parallel
-    async def generate_segment_audio(i, segment_text, lang):
-        """Generate audio for a single segment"""
-        print(f"Segment {i+1}: {lang} - {segment_text[:50]}...")
-        try:
-            if lang == 'ta':  # Tamil
-                audio = await generate_tamil_audio(segment_text)
-            else:  # English
-                audio = await generate_english_audio(segment_text)
-            if job_id:
-                cur = 10 + int(((i + 1) / total) * 80)
-                _set_progress(job_id, cur, f'Processed segment {i+1}/{total}')
-            return audio
-        except Exception as e:
-            print(f"Error processing segment {i+1}: {e}")
-            if job_id:
-                cur = 10 + int(((i + 1) / total) * 80)
-                _set_progress(job_id, cur, f'Processed segment {i+1}/{total}')
-            return AudioSegment.silent(duration=1000)
+    async def generate_segment_audio(i, group):
+        """Generate audio for a single segment (or multi-voice group)"""
+        nonlocal completed
+        # gather runs each call in its own task, so this list only sees this group's failures
+        failures = []
+        _failed_segments.set(failures)
+        audio = await _synthesize_group(i, group)
+        if failures:
+            entries[todo[i][0]]['failed'] = True
+        completed += 1
+        if on_segment:
+            on_segment(completed, total)
+        return audio
     
     # Run all segment generation tasks in parallel
-    tasks = [generate_segment_audio(i, segment_text, lang) for i, (segment_text, lang) in enumerate(segments)]
+    tasks = [generate_segment_audio(i, group) for i, (_, group) in enumerate(todo)]
     audio_segments = await asyncio.gather(*tasks)
     
-    if not audio_segments:
-        raise Exception("No audio segments were generated")
+    # Decode every segment to the canonical layout and join each paragraph in one buffer;
+    # short gap only when language changes, otherwise join directly
+    # CPU-bound, so it runs off the event loop, which other requests may be sharing
+    await asyncio.to_thread(_finish_paragraphs, entries, planned, todo, audio_segments)
+    return entries
+
+def _finish_paragraphs(entries, planned, todo, audio_segments):
+    """Join each synthesized paragraph's clips, speed it up and store it in the paragraph cache"""
+    rate = TTS_CONFIG['sample_rate']
+    audio_by_paragraph = {}
+    for (index, _), audio in zip(todo, audio_segments):
+        audio_by_paragraph.setdefault(index, []).append(audio)
+    for index, paragraph_audio in audio_by_paragraph.items():
+        # One combine span per paragraph: decoding its clips and joining them
+        with METRICS.span('combine'):
+            clips = [to_canonical(audio, rate) for audio in paragraph_audio]
+            combined = assemble(clips, _switch_gaps(planned[index]), TTS_CONFIG['crossfade_ms'], rate)
+        entry = entries[index]
+        entry['samples'] = _speed_up(combined)
+        if not entry['failed']:
+            PARAGRAPH_CACHE.put(entry['hash'], encode(entry['samples'], rate, 'pcm'), 'pcm')
+
+async def process_text_to_speech(source, job_id: str = None, output_format: str = 'mp3'):
+    """Main function to process text and generate mixed-language audio.
+
+    ``source`` is a string or a DocumentSource. The document is rendered in
+    chunks of whole paragraphs and each paragraph is appended to a PCM spool
+    file as soon as its chunk finishes; the spool is then encoded block by
+    block. Paragraphs whose text and settings were rendered before are taken
+    from the paragraph cache, so an edited document only re-synthesizes what
+    changed. A manifest of paragraph hashes and sample offsets is written
+    next to the output (see ``manifest_path``).
+
+    Returns ``(output_path, failed_paragraphs)``; paragraphs that failed
+    contain silence, so an output with any must not be cached.
+    """
+    if isinstance(source, str):
+        source = DocumentSource(text=source)
+    rate = TTS_CONFIG['sample_rate']
+    # Timing spans in this task, its children and its executor calls count towards the job
+    job_token = current_job.set(job_id)
     
-    # Combine all audio segments with minimal gap between language switches
-    print("Combining audio segments...")
     if job_id:
-        _set_progress(job_id, 92, 'Combining audio segments')
-    combined_audio = audio_segments[0]
-    for i, segment in enumerate(segments[1:], 1):
-        # Add 5ms gap only when language changes, otherwise join directly
-        prev_lang = segments[i-1][1]
-        curr_lang = segment[1]
-        if prev_lang != curr_lang:
-            combined_audio = combined_audio + AudioSegment.silent(duration=0.005)
-        combined_audio = combined_audio + audio_segments[i]
-    
-    # Speed up the final audio by 25%
-    faster_audio = combined_audio.speedup(playback_speed=1.25, chunk_size=150, crossfade=25)
-    output_path = os.path.join(TEMP_DIR, "mixed_output.mp3")
-    faster_audio.export(output_path, format="mp3", bitrate="192k")
+        _set_progress(job_id, 5, 'Splitting text into segments')
+    spool = PcmSpool(TEMP_DIR)
+    manifest = []
+    try:
+        done = 0.0
+        last_lang = None
+        chunks = source.chunks(TTS_CONFIG['render_chunk_chars'])
+        for part, (paragraphs, fraction) in enumerate(chunks, start=1):
+            print(f"Processing part {part}: {paragraphs[0][:100]}...")
+            
+            def report(i, total, start=done, end=fraction, part=part):
+                if job_id:
+                    cur = 10 + int((start + (end - start) * i / total) * 80)
+                    _set_progress(job_id, cur, f'Processed segment {i}/{total} of part {part}')
+            
+            entries = await _render_chunk(paragraphs, report)
+            done = fraction
+            for paragraph, entry in zip(paragraphs, entries):
+                if entry is not None and last_lang is not None and entry['first_lang'] != last_lang:
+                    spool.append(np.zeros(int(rate * TTS_CONFIG['switch_gap_ms'] / 1000), dtype=np.float32))
+                start = spool.samples
+                if entry is not None:
+                    spool.append(entry['samples'])
+                    last_lang = entry['last_lang']
+                manifest.append({
+                    'index': len(manifest),
+                    'hash': entry['hash'] if entry else None,
+                    'start_sample': start,
+                    'end_sample': spool.samples,
+                    'start_seconds': round(start / rate, 3),
+                    'end_seconds': round(spool.samples / rate, 3),
+                    'reused': bool(entry and entry['reused']),
+                    'failed': bool(entry and entry['failed']),
+                    'preview': paragraph.strip()[:60],
+                })
+        
+        if not spool.samples:
+            raise Exception("No audio segments were generated")
+        
+        print("Encoding audio...")
+        if job_id:
+            _set_progress(job_id, 92, 'Encoding audio')
+        # Unique artifact per job so concurrent jobs never overwrite each other
+        extension = OUTPUT_FORMATS[output_format]['extension']
+        output_path = os.path.join(TEMP_DIR, f"{job_id or uuid.uuid4().hex}.{extension}")
+        with METRICS.span('export', format=output_format):
+            await asyncio.to_thread(encode_to_file, spool.blocks(), output_path, rate, output_format)
+        with open(manifest_path(output_path), 'w', encoding='utf-8') as f:
+            json.dump({
+                'format': output_format,
+                'sample_rate': rate,
+                'duration_seconds': round(spool.samples / rate, 3),
+                'reused_paragraphs': sum(1 for p in manifest if p['reused']),
+                'synthesized_paragraphs': sum(1 for p in manifest if p['hash'] and not p['reused']),
+                'failed_paragraphs': sum(1 for p in manifest if p['failed']),
+                'paragraphs': manifest,
+            }, f, ensure_ascii=False)
+    finally:
+        spool.close()
+        current_job.reset(job_token)
     
-    print("Audio generation completed successfully")
+    failed = sum(1 for p in manifest if p['failed'])
+    print("Audio generation completed successfully" if not failed
+          else f"Audio generation completed with {failed} failed paragraphs")
     if job_id:
         _set_progress(job_id, 100, 'Completed')
-    return output_path
+    return output_path, failed
 
-def _run_conversion_job(job_id: str, text: str):
-    """Run the conversion job in a background thread using its own event loop."""
+async def _drain_to_queue(chunks, results, stop, handle):
+    """Put each item of the async generator ``chunks`` on ``results``, then None.
+
+    The running loop and task are published in ``handle`` so the consumer can
+    cancel the generator; ``stop`` covers a consumer that gave up before that.
+    An exception is put on the queue for the consumer to raise.
+    """
+    handle['loop'], handle['task'] = asyncio.get_running_loop(), asyncio.current_task()
+    try:
+        if not stop.is_set():
+            async for chunk in chunks:
+                results.put(chunk)
+    except asyncio.CancelledError:
+        pass  # Cancelled by the consumer
+    except Exception as e:
+        results.put(e)
+    finally:
+        await chunks.aclose()
+        results.put(None)
+
+def _iterate_in_thread(chunks):
+    """Iterate the async generator ``chunks`` from blocking code.
+
+    The generator runs on its own event loop in a worker thread; closing
+    this iterator (e.g. when the client disconnects) cancels it.
+    """
+    results = queue.Queue()
+    stop = threading.Event()
+    handle = {}
+    worker = threading.Thread(
+        target=lambda: asyncio.run(_drain_to_queue(chunks, results, stop, handle)),
+        daemon=True,
+    )
+    worker.start()
+    try:
+        while True:
+            item = results.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        if handle:
+            try:
+                handle['loop'].call_soon_threadsafe(handle['task'].cancel)
+            except RuntimeError:
+                pass  # Already finished and its loop closed
+
+def _encode_stream_chunk(audio, gap_ms=0, output_format='mp3'):
+    """Speed up and encode a single segment as a self-contained chunk"""
+    rate = TTS_CONFIG['sample_rate']
+    silence = np.zeros(int(rate * gap_ms / 1000), dtype=np.float32)
+    clip = np.concatenate([silence, to_canonical(audio, rate)])
+    faster = _speed_up(clip)
+    with METRICS.span('export', format=output_format):
+        return encode(faster, rate, output_format)
+
+async def _astream_groups(groups, first_gap_ms, output_format):
+    """Yield encoded audio for one chunk's groups, in order, as soon as each prefix is ready"""
+    gaps = [first_gap_ms] + _switch_gaps(groups)
+    tasks = [asyncio.ensure_future(_synthesize_group(i, group)) for i, group in enumerate(groups)]
+    try:
+        # Awaiting in order emits each segment as soon as every one before it is ready
+        for task, gap_ms in zip(tasks, gaps):
+            audio = await task
+            yield await asyncio.to_thread(_encode_stream_chunk, audio, gap_ms, output_format)
+    finally:
+        # A client that disconnects stops the rest of the chunk
+        for task in tasks:
+            task.cancel()
+
+def _stream_plan(source):
+    """Yield ``(groups, first_gap_ms)`` for each chunk of the document that has speech"""
+    last_lang = None
+    for paragraphs, _ in source.chunks(TTS_CONFIG['render_chunk_chars']):
+        groups = group_requests(plan_text('\n'.join(paragraphs)))
+        if not groups:
+            continue
+        print(f"Streaming {len(groups)} segments")
+        first_gap = TTS_CONFIG['switch_gap_ms'] if last_lang not in (None, groups[0][0][1]) else 0
+        yield groups, first_gap
+        last_lang = groups[-1][-1][1]
+
+def stream_text_to_speech(source, output_format='mp3'):
+    """Blocking version of astream_text_to_speech, for the Flask server"""
+    return _iterate_in_thread(astream_text_to_speech(source, output_format))
+
+async def astream_text_to_speech(source, output_format='mp3'):
+    """Yield encoded audio per segment, in order, reading the document a chunk at a time"""
+    if isinstance(source, str):
+        source = DocumentSource(text=source)
+    try:
+        for groups, first_gap in _stream_plan(source):
+            async for chunk in _astream_groups(groups, first_gap, output_format):
+                yield chunk
+    finally:
+        source.discard()
+
+async def _run_conversion_job(job_id: str, source: DocumentSource, output_format: str = 'mp3'):
+    """Run one queued conversion job on a job worker's event loop."""
     try:
         _set_status(job_id, 'running', 'Starting conversion')
-        # Run the async pipeline in this thread
-        output_path = asyncio.run(process_text_to_speech(text, job_id=job_id))
+        output_path, failed = await process_text_to_speech(source, job_id=job_id, output_format=output_format)
         job = JOBS.get(job_id, {})
         job['output_path'] = output_path
+        job['failed_paragraphs'] = failed
+        # Silence from a failed segment is not cached, so the next request retries it
+        if job.get('result_key') and not failed:
+            # Copies the whole output; keep it off a loop other requests may share
+            await asyncio.to_thread(_store_result, job['result_key'], output_path, output_format)
         _set_status(job_id, 'finished', 'Conversion completed')
-        _set_progress(job_id, 100, 'Completed')
     except Exception as e:
         job = JOBS.get(job_id, {})
         job['error'] = str(e)
         _set_status(job_id, 'error', f'Conversion failed: {e}')
+    finally:
+        source.discard()
 
 # ============================================================================
 # API ROUTES
 # ============================================================================
 
-@app.route('/convert', methods=['POST'])
+def parse_source(text, upload):
+    """Return (DocumentSource, None) for the submitted text or upload, or (None, error message).
+
+    ``upload`` is ``(filename, stream)`` or None. Uploaded files are saved
+    to TEMP_DIR rather than read into memory; the caller discards the
+    source once it has been converted.
+    """
+    if text and text.strip():
+        source = DocumentSource(text=text.strip())
+    elif upload is not None:
+        filename, stream = upload
+        if not filename:
+            return None, 'No file selected'
+        source = DocumentSource.from_upload(filename, stream, TEMP_DIR)
+        if source is None:
+            return None, 'Unsupported file type. Use .txt or .docx'
+    else:
+        return None, 'No text or file provided'
+
+    if source.is_empty():
+        source.discard()
+        return None, 'No text content found'
+    return source, None
+
+def parse_output_format(requested, allowed=tuple(OUTPUT_FORMATS)):
+    """Return (format, None) for a requested format, or (None, error message) if unsupported"""
+    if not requested:
+        output_format = TTS_CONFIG['output_format']
+        # A streamed default must still be concatenable
+        return (output_format if output_format in allowed else 'mp3'), None
+    output_format = resolve_format(requested)
+    if output_format not in allowed:
+        return None, f"Unsupported format '{requested}'. Use one of: {', '.join(allowed)}"
+    return output_format, None
+
+def cached_result(key):
+    """``(path, output_format)`` of a cached document by its key, or None"""
+    cached = RESULT_CACHE.path(key)
+    if not cached:
+        return None
+    path, extension = cached
+    output_format = next((name for name, spec in OUTPUT_FORMATS.items() if spec['extension'] == extension), None)
+    return (path, output_format) if output_format else None
+
+async def convert_document(source, output_format, client_etags=()):
+    """Render a document for /convert, answering from the result cache when possible.
+
+    Returns ``(path, output_format, etag, temporary)``. ``path`` is None
+    when ``client_etags`` already holds the result. A ``temporary`` output
+    was too large for the result cache; nothing else refers to it, so the
+    caller deletes it once opened. An output with failed segments is not
+    cached and gets no ``etag``, so clients do not keep its silence.
+    """
+    # Identical text and settings produce identical audio, so answer from the cache
+    key = await asyncio.to_thread(result_key, source, output_format)
+    if key in client_etags or '*' in client_etags:
+        return None, output_format, key, False
+    cached = cached_result(key)
+    if cached:
+        return cached[0], cached[1], key, False
+
+    output_path, failed = await process_text_to_speech(source, output_format=output_format)
+    if failed:
+        _remove_file(manifest_path(output_path))
+        return output_path, output_format, None, True
+    await asyncio.to_thread(_store_result, key, output_path, output_format)
+    _remove_file(manifest_path(output_path))
+    cached = cached_result(key)
+    if cached:
+        _remove_file(output_path)
+        return cached[0], cached[1], key, False
+    return output_path, output_format, key, True
+
+def submit_conversion(source, output_format):
+    """Queue an async conversion and return ``(body, status, headers)`` for the response"""
+    # A cached result is returned at once, under its cache key, without a job
+    key = result_key(source, output_format)
+    if RESULT_CACHE.path(key):
+        source.discard()
+        return {'job_id': key, 'status': 'finished', 'cached': True}, 200, {}
+
+    job_id = uuid.uuid4().hex
+    _init_job(job_id, output_format, key, source.path)
+
+    try:
+        JOB_QUEUE.submit(job_id, _run_conversion_job, job_id, source, output_format)
+    except QueueFull as e:
+        JOBS.pop(job_id)
+        source.discard()
+        return (
+            {'error': 'Server busy, too many queued conversions', 'retry_after': e.retry_after},
+            429,
+            {'Retry-After': str(e.retry_after)},
+        )
+    return {'job_id': job_id}, 202, {}
+
+def download_target(job_id):
+    """Return ((path, output_format, etag), None) for /download, or (None, (error message, status))"""
+    job = JOBS.get(job_id)
+    if not job:
+        cached = cached_result(job_id)
+        if cached:
+            return (cached[0], cached[1], job_id), None
+        return None, ('Job not found', 404)
+    if job.get('status') != 'finished' or not job.get('output_path'):
+        return None, ('Job not finished', 400)
+    # Silence from a failed segment must not be revalidated later, so such output gets no ETag
+    etag = None if job.get('failed_paragraphs') else job.get('result_key')
+    return (job['output_path'], job.get('output_format', 'mp3'), etag), None
+
+def manifest_target(job_id):
+    """Return (manifest path, None) for /manifest, or (None, (error message, status))"""
+    job = JOBS.get(job_id)
+    if job:
+        if job.get('status') != 'finished' or not job.get('output_path'):
+            return None, ('Job not finished', 400)
+        return manifest_path(job['output_path']), None
+    cached = RESULT_CACHE.path(f"{job_id}-manifest")
+    if not cached:
+        return None, ('Job not found', 404)
+    return cached[0], None
+
+def metrics_text():
+    """Stage timings plus queue, cache and engine metrics in Prometheus text format"""
+    gauges = {}
+    counters = {}
+    queue_stats = JOB_QUEUE.stats()
+    for name in ('running', 'queued'):
+        gauges[(f'jobs_{name}', ())] = queue_stats[name]
+    for name in ('completed', 'failed', 'rejected'):
+        counters[(f'jobs_{name}_total', ())] = queue_stats[name]
+    for cache_name, cache in (('segment', SEGMENT_CACHE), ('result', RESULT_CACHE), ('paragraph', PARAGRAPH_CACHE)):
+        stats = cache.stats()
+        labels = (('cache', cache_name),)
+        gauges[('cache_bytes', labels)] = stats['bytes']
+        counters[('cache_hits_total', labels)] = stats['hits']
+        counters[('cache_misses_total', labels)] = stats['misses']
+    for engine, stats in ENGINE_ROUTER.stats()['engines'].items():
+        counters[('engine_requests_total', (('engine', engine),))] = stats['requests']
+        counters[('engine_failures_total', (('engine', engine),))] = stats['failures']
+    return METRICS.render(gauges, counters)
+
+def health_status():
+    """Body of /health: engine status and capabilities, queue and cache stats"""
+    engines_status = {name: ENGINE_ROUTER.status(name) for name in ENGINES.names()}
+    engines_status.update({
+        'preferred_engine': TTS_CONFIG['preferred_engine'],
+        'concurrency': SYNTH_POOL.limits(),
+        'capabilities': ENGINES.describe(),
+    })
+    return {
+        'status': 'healthy',
+        'message': 'TTS Service is running',
+        'engines': engines_status,
+        'router': ENGINE_ROUTER.stats(),
+        'job_queue': JOB_QUEUE.stats(),
+        'segment_cache': SEGMENT_CACHE.stats(),
+        'result_cache': RESULT_CACHE.stats(),
+        'paragraph_cache': PARAGRAPH_CACHE.stats(),
+        'hf_tts_models': parler_registry.registry_stats()
+    }
+
+def _error(message, status=400):
+    return jsonify({'error': message}), status
+
+def _read_request_source():
+    """Return (DocumentSource, None) from the request, or (None, error_response) if unusable"""
+    file = request.files.get('file')
+    upload = (file.filename, file.stream) if file else None
+    source, error = parse_source(request.values.get('text'), upload)
+    return source, (_error(error) if error else None)
+
+def _read_output_format(allowed=tuple(OUTPUT_FORMATS)):
+    """Return (format, None) from ?format=, or (None, error_response) if unsupported"""
+    output_format, error = parse_output_format(request.values.get('format'), allowed)
+    return output_format, (_error(error) if error else None)
+
+def _send_audio(source, output_format, etag=None):
+    """send_file for an encoded result with the format's mimetype and file extension.
+
+    With an ``etag`` the response is conditional: GET and HEAD requests get
+    ``304`` for a matching ``If-None-Match`` and partial content for ``Range``.
+    """
+    spec = OUTPUT_FORMATS[output_format]
+    return send_file(
+        source,
+        as_attachment=True,
+        download_name=f"mixed_tts_output.{spec['extension']}",
+        mimetype=spec['mimetype'],
+        conditional=True,
+        etag=etag if etag else False
+    )
+
+def _not_modified(etag):
+    """304 for a client that already holds ``etag``, checked before any rendering"""
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+@app.route('/convert', methods=['GET', 'POST'])
 async def convert_text_to_speech():
     """Main endpoint for text-to-speech conversion"""
+    source = None
     try:
-        text = ""
-        
-        # Check if text was provided directly
-        if 'text' in request.form and request.form['text'].strip():
-            text = request.form['text'].strip()
-        # Check if file was uploaded
-        elif 'file' in request.files:
-            file = request.files['file']
-            if file.filename == '':
-                return jsonify({'error': 'No file selected'}), 400
-            
-            filename = file.filename.lower()
-            
-            if filename.endswith('.txt'):
-                text = file.read().decode('utf-8')
-            elif filename.endswith('.docx'):
-                text = extract_text_from_docx(file)
-            else:
-                return jsonify({'error': 'Unsupported file type. Use .txt or .docx'}), 400
-        else:
-            return jsonify({'error': 'No text or file provided'}), 400
-        
-        if not text.strip():
-            return jsonify({'error': 'No text content found'}), 400
+        output_format, error = _read_output_format()
+        if error:
+            return error
+        source, error = _read_request_source()
+        if error:
+            return error
         
-        # Process text and generate audio
-        output_path = await process_text_to_speech(text)
-        
-        return send_file(
-            output_path,
-            as_attachment=True,
-            download_name='mixed_tts_output.mp3',
-            mimetype='audio/mpeg'
-        )
+        path, output_format, key, temporary = await convert_document(source, output_format, request.if_none_match)
+        if path is None:
+            return _not_modified(key)
+        if temporary:
+            # Unlink once opened; the sweeper catches it on platforms that refuse
+            # to delete open files
+            output_file = open(path, 'rb')
+            _remove_file(path)
+            return _send_audio(output_file, output_format, etag=key)
+        return _send_audio(path, output_format, etag=key)
         
     except Exception as e:
         print(f"Error in conversion: {str(e)}")
         return jsonify({'error': f'Conversion failed: {str(e)}'}), 500
+    finally:
+        if source:
+            source.discard()
 
 @app.route('/convert_async', methods=['POST'])
 def convert_text_to_speech_async():
     """Start an async conversion job and return a job_id for progress polling."""
     try:
-        text = ""
-
-        if 'text' in request.form and request.form['text'].strip():
-            text = request.form['text'].strip()
-        elif 'file' in request.files:
-            file = request.files['file']
-            if file.filename == '':
-                return jsonify({'error': 'No file selected'}), 400
-            filename = file.filename.lower()
-            if filename.endswith('.txt'):
-                text = file.read().decode('utf-8')
-            elif filename.endswith('.docx'):
-                text = extract_text_from_docx(file)
-            else:
-                return jsonify({'error': 'Unsupported file type. Use .txt or .docx'}), 400
-        else:
-            return jsonify({'error': 'No text or file provided'}), 400
-
-        if not text.strip():
-            return jsonify({'error': 'No text content found'}), 400
-
-        job_id = uuid.uuid4().hex
-        _init_job(job_id)
-
-        # Start background thread
-        t = threading.Thread(target=_run_conversion_job, args=(job_id, text), daemon=True)
-        t.start()
-
-        return jsonify({'job_id': job_id}), 202
+        output_format, error = _read_output_format()
+        if error:
+            return error
+        source, error = _read_request_source()
+        if error:
+            return error
+        body, status, headers = submit_conversion(source, output_format)
+        return jsonify(body), status, headers
     except Exception as e:
         print(f"Error starting async conversion: {e}")
         return jsonify({'error': f'Failed to start conversion: {str(e)}'}), 500
 
+@app.route('/convert_stream', methods=['GET', 'POST'])
+def convert_text_to_speech_stream():
+    """Stream MP3 (or raw PCM) audio segment by segment using chunked transfer"""
+    try:
+        output_format, error = _read_output_format(STREAMABLE_FORMATS)
+        if error:
+            return error
+        source, error = _read_request_source()
+        if error:
+            return error
+        return Response(
+            stream_text_to_speech(source, output_format),
+            mimetype=OUTPUT_FORMATS[output_format]['mimetype'],
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    except Exception as e:
+        print(f"Error starting streaming conversion: {e}")
+        return jsonify({'error': f'Conversion failed: {str(e)}'}), 500
+
 @app.route('/progress/<job_id>', methods=['GET'])
 def get_progress(job_id):
     job = JOBS.get(job_id)
     if not job:
         return jsonify({'error': 'Job not found'}), 404
-    # Do not expose internal paths
-    result = {k: v for k, v in job.items() if k != 'output_path'}
-    return jsonify(result)
+    return jsonify(_job_snapshot(job_id, job))
 
-@app.route('/download/<job_id>', methods=['GET'])
-def download_result(job_id):
+def _progress_events(job_id: str):
+    """SSE messages for a job until it finishes, fails or is evicted.
+
+    Yields message strings, and a timeout in seconds whenever it needs the
+    next update; the caller sends back that update, or None if none came
+    in time. The blocking and async streams below only do the waiting.
+    """
     job = JOBS.get(job_id)
-    if not job:
+    snapshot = _job_snapshot(job_id, job) if job else None
+    # Reconnect quickly if the connection drops mid-job
+    yield "retry: 2000\n\n"
+    while snapshot is not None:
+        yield format_sse(snapshot)
+        if snapshot.get('status') in TERMINAL_STATUSES:
+            return
+        # While queued, wake every second so the queue position stays current
+        update = yield 1 if snapshot.get('status') == 'queued' else SSE_KEEPALIVE_SECONDS
+        if update is None:
+            job = JOBS.get(job_id)
+            if not job:
+                break
+            if job.get('status') != 'queued':
+                yield ": keepalive\n\n"
+                continue
+            update = _job_snapshot(job_id, job)
+        snapshot = update
+    yield format_sse({'error': 'Job not found'}, event='error')
+
+def _progress_event_stream(job_id: str, updates):
+    """Yield SSE messages for a job, blocking on its subscription queue"""
+    events = _progress_events(job_id)
+    update = None
+    try:
+        while True:
+            try:
+                item = events.send(update)
+            except StopIteration:
+                return
+            update = None
+            if isinstance(item, str):
+                yield item
+                continue
+            try:
+                update = updates.get(timeout=item)
+            except queue.Empty:
+                pass
+    finally:
+        PROGRESS_EVENTS.unsubscribe(job_id, updates)
+
+async def _aprogress_event_stream(job_id: str, updates):
+    """Yield SSE messages for a job, awaiting an AsyncSubscription on the running loop"""
+    events = _progress_events(job_id)
+    update = None
+    try:
+        while True:
+            try:
+                item = events.send(update)
+            except StopIteration:
+                return
+            update = None
+            if isinstance(item, str):
+                yield item
+                continue
+            try:
+                update = await asyncio.wait_for(updates.get(), item)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        PROGRESS_EVENTS.unsubscribe(job_id, updates)
+
+@app.route('/progress/<job_id>/events', methods=['GET'])
+def get_progress_events(job_id):
+    """Push progress updates for a job as Server-Sent Events"""
+    if job_id not in JOBS:
         return jsonify({'error': 'Job not found'}), 404
-    if job.get('status') != 'finished' or not job.get('output_path'):
-        return jsonify({'error': 'Job not finished'}), 400
-    return send_file(
-        job['output_path'],
-        as_attachment=True,
-        download_name='mixed_tts_output.mp3',
-        mimetype='audio/mpeg'
+    # Subscribe before reading the current state so no update is missed in between
+    updates = PROGRESS_EVENTS.subscribe(job_id)
+    return Response(
+        _progress_event_stream(job_id, updates),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
     )
 
+@app.route('/download/<job_id>', methods=['GET'])
+def download_result(job_id):
+    """Finished job output, or a cached result by the key /convert_async returned"""
+    target, error = download_target(job_id)
+    if error:
+        return _error(*error)
+    path, output_format, etag = target
+    try:
+        return _send_audio(path, output_format, etag=etag)
+    except OSError:
+        # Evicted from the result cache between the lookup and the open
+        return _error('Job not found', 404)
+
+@app.route('/manifest/<job_id>', methods=['GET'])
+def get_manifest(job_id):
+    """Paragraph index of a finished job or cached result: content hashes and time offsets"""
+    path, error = manifest_target(job_id)
+    if error:
+        return _error(*error)
+    try:
+        return send_file(path, mimetype='application/json')
+    except OSError:
+        return _error('Manifest not available', 404)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Stage timing histograms and service counters in Prometheus text format"""
+    return Response(metrics_text(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint with TTS engine status"""
-    engines_status = {
-        'edge': 'available',
-        'gtts': 'available',
-        'preferred_engine': TTS_CONFIG['preferred_engine']
-    }
-    return jsonify({
-        'status': 'healthy',
-        'message': 'TTS Service is running',
-        'engines': engines_status
-    })
+    return jsonify(health_status())
 
 if __name__ == '__main__':
     # Ensure temp directory exists
@@ -513,4 +1215,9 @@ if __name__ == '__main__':
     print(f"gTTS: ✓ Available")
     print(f"Preferred Engine: {TTS_CONFIG['preferred_engine']}")
     print("="*60 + "\n")
+    if TTS_CONFIG['preferred_engine'] in ['hf-tts', 'auto']:
+        # Load and warm the Parler model before the first request needs it
+        threading.Thread(target=parler_registry.get_model, daemon=True).start()
+    # HTTP/1.1 so /convert_stream is sent with chunked transfer encoding
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
     app.run(debug=True, port=5000)
@@ -0,0 +1,105 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds; pipeline stages range from sub-millisecond to minutes
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Job the current task (and executor calls it makes) is working for, if any
+current_job = contextvars.ContextVar('tts_current_job', default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+class StageMetrics:
+    """Timing histograms per pipeline stage, rendered in Prometheus text format.
+
+    ``span()`` times a block and records it under the stage and its labels.
+    ``on_span`` is also told about each span together with the job bound
+    through ``current_job``, so callers can keep a per-job breakdown. The
+    block can fill in the dict the span yields with numeric details (such as
+    a character count) that go to ``on_span`` but not into the labels.
+    """
+
+    def __init__(self, prefix='tts', buckets=DEFAULT_BUCKETS, on_span=None):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self.on_span = on_span
+        self._lock = threading.Lock()
+        self._histograms = {}  # (stage, labels) -> [bucket counts..., sum, count]
+        self._counters = {}  # (name, labels) -> value
+
+    def observe(self, stage, seconds, **labels):
+        key = (stage, tuple(sorted(labels.items())))
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                entry[index] += 1
+            entry[-2] += seconds
+            entry[-1] += 1
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Time the enclosed block as one observation of ``stage``"""
+        details = {}
+        start = time.perf_counter()
+        try:
+            yield details
+        finally:
+            self.record(stage, time.perf_counter() - start, details, **labels)
+
+    def record(self, stage, seconds, details=None, **labels):
+        """Record ``seconds`` the caller timed itself as one observation of ``stage``, like a span"""
+        self.observe(stage, seconds, **labels)
+        if self.on_span:
+            self.on_span(current_job.get(), stage, seconds, labels, details or {})
+
+    def render(self, gauges=None, counters=None):
+        """Prometheus exposition text.
+
+        ``gauges`` and ``counters`` map ``(name, ((label, value), ...))`` to
+        extra values kept elsewhere; counter names end in ``_total``.
+        """
+        with self._lock:
+            histograms = {key: list(entry) for key, entry in self._histograms.items()}
+            counters = {**self._counters, **(counters or {})}
+        name = f'{self.prefix}_stage_seconds'
+        lines = [f'# HELP {name} Time spent in each pipeline stage', f'# TYPE {name} histogram']
+        for (stage, labels), entry in sorted(histograms.items()):
+            base = (('stage', stage),) + labels
+            cumulative = 0
+            for bound, n in zip(self.buckets, entry):
+                cumulative += n
+                lines.append(f'{name}_bucket{_format_labels(base + (("le", repr(bound)),))} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(base + (("le", "+Inf"),))} {entry[-1]}')
+            lines.append(f'{name}_sum{_format_labels(base)} {entry[-2]:.6f}')
+            lines.append(f'{name}_count{_format_labels(base)} {entry[-1]}')
+        for counter in sorted({n for n, _ in counters}):
+            lines.append(f'# TYPE {self.prefix}_{counter} counter')
+            for (n, labels), value in sorted(counters.items()):
+                if n == counter:
+                    lines.append(f'{self.prefix}_{n}{_format_labels(labels)} {value}')
+        for gauge in sorted({n for n, _ in (gauges or {})}):
+            lines.append(f'# TYPE {self.prefix}_{gauge} gauge')
+            for (n, labels), value in sorted(gauges.items()):
+                if n == gauge:
+                    lines.append(f'{self.prefix}_{n}{_format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
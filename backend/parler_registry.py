@@ -0,0 +1,379 @@
+import contextlib
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+HF_TTS_MODEL = "ai4bharat/indic-parler-tts"
+
+DEFAULT_DESCRIPTION = (
+    "A female speaker delivers a slightly expressive and animated speech with a moderate speed and pitch. "
+    "The recording is of very high quality, with the speaker's voice sounding clear and very close up."
+)
+
+# CPU inference profiles:
+#   default - fp32 weights, model.generate's own no_grad (the original behaviour)
+#   fp32    - fp32 weights under torch.inference_mode
+#   int8    - dynamic int8 quantization of Linear layers, inference_mode
+#   bf16    - bfloat16 autocast where the CPU supports it, inference_mode
+PROFILES = ('default', 'fp32', 'int8', 'bf16')
+PARLER_PROFILE = os.getenv('TTS_PARLER_PROFILE', 'fp32')
+# 0 keeps PyTorch's own thread pool sizes
+TORCH_THREADS = int(os.getenv('TTS_TORCH_THREADS', '0'))
+TORCH_INTEROP_THREADS = int(os.getenv('TTS_TORCH_INTEROP_THREADS', '0'))
+
+# Distinct speaker descriptions whose tokens and encoder outputs are kept
+DESCRIPTION_CACHE_SIZE = 8
+
+# Short mixed prompt used to warm up kernels and caches right after loading
+WARMUP_PROMPT = "வணக்கம். Hello."
+
+
+def _configure_threads(torch, threads, interop_threads):
+    if threads:
+        torch.set_num_threads(threads)
+    if interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError as e:
+            # Only allowed before any inter-op parallel work has started
+            print(f"Could not set inter-op threads: {e}")
+
+
+def _bf16_supported(torch):
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def _default_device(torch):
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _resolve_profile(torch, profile, device):
+    """The profile a model runs when ``profile`` is requested on ``device``, and why it differs"""
+    if profile in ('int8', 'bf16') and device != 'cpu':
+        return 'fp32', f"Parler profile '{profile}' is CPU only, using 'fp32' on {device}"
+    if profile == 'bf16' and not _bf16_supported(torch):
+        return 'fp32', "This CPU has no native bf16 support, using 'fp32'"
+    return profile, None
+
+
+@functools.lru_cache(maxsize=None)
+def effective_profile(profile=PARLER_PROFILE):
+    """The profile get_model(profile=...) runs on this machine, without loading a model.
+
+    Requested CPU profiles fall back to fp32 on a GPU or, for bf16, on CPUs
+    without bf16 support; audio differs between profiles, so cache keys use
+    this rather than the requested profile.
+    """
+    try:
+        import torch
+    except ImportError:
+        # Nothing can load without torch; the requested profile is as good a name as any
+        return profile
+    return _resolve_profile(torch, profile, _default_device(torch))[0]
+
+
+def _hf_token():
+    # Token must be provided via environment variable. Do NOT store secrets in the repository.
+    return os.getenv('TTS_HF_TOKEN') or os.getenv('HF_TOKEN')
+
+
+class ParlerModel:
+    """A loaded Parler-TTS model with its prompt and description tokenizers.
+
+    torch, transformers and parler_tts are imported here rather than at
+    module level so the server can run without them when HF TTS is unused.
+    """
+
+    def __init__(self, model_name=HF_TTS_MODEL, device=None, profile=PARLER_PROFILE,
+                 threads=TORCH_THREADS, interop_threads=TORCH_INTEROP_THREADS):
+        import torch
+        from parler_tts import ParlerTTSForConditionalGeneration
+        from transformers import AutoTokenizer
+
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown Parler profile '{profile}', expected one of {PROFILES}")
+        self._torch = torch
+        self.model_name = model_name
+        self.device = device or _default_device(torch)
+        token = _hf_token()
+        _configure_threads(torch, threads, interop_threads)
+
+        start = time.perf_counter()
+        self.model = ParlerTTSForConditionalGeneration.from_pretrained(model_name, token=token).to(self.device)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, token=token)
+        self.description_tokenizer = AutoTokenizer.from_pretrained(
+            self.model.config.text_encoder._name_or_path, token=token
+        )
+        self.sampling_rate = self.model.config.sampling_rate
+        self.model.eval()
+
+        profile, fallback = _resolve_profile(torch, profile, self.device)
+        if fallback:
+            print(fallback)
+        if profile == 'int8':
+            torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+        self.profile = profile
+        self.load_seconds = time.perf_counter() - start
+
+        self.warmup_seconds = None
+        self.first_inference_seconds = None
+        self.generations = 0
+        self.total_inference_seconds = 0.0
+        # model.generate is not safe to call from several threads at once
+        self._lock = threading.Lock()
+
+        # Description conditioning is memoized: tokens per description string,
+        # text encoder outputs per exact description token tensor
+        self._description_tokens = OrderedDict()
+        self._encoder_outputs = OrderedDict()
+        self.description_cache_hits = 0
+        self.description_cache_misses = 0
+        self.stage_seconds = dict.fromkeys(
+            ('tokenize_description', 'encode_description', 'tokenize_prompt', 'decode'), 0.0
+        )
+        self.last_timings = {}
+        self._encode_seconds = 0.0
+        self._wrap_text_encoder()
+
+    def _wrap_text_encoder(self):
+        """Serve repeated description encodings from an LRU instead of re-running the encoder"""
+        encoder = self.model.text_encoder
+        encode = encoder.forward
+
+        def cached_forward(*args, **kwargs):
+            input_ids = kwargs.get('input_ids', args[0] if args else None)
+            attention_mask = kwargs.get('attention_mask')
+            key = None
+            if input_ids is not None:
+                key = (
+                    tuple(input_ids.shape),
+                    input_ids.cpu().numpy().tobytes(),
+                    None if attention_mask is None else attention_mask.cpu().numpy().tobytes(),
+                )
+                if key in self._encoder_outputs:
+                    self._encoder_outputs.move_to_end(key)
+                    self.description_cache_hits += 1
+                    return self._encoder_outputs[key]
+            start = time.perf_counter()
+            outputs = encode(*args, **kwargs)
+            self._encode_seconds += time.perf_counter() - start
+            if key is not None:
+                self.description_cache_misses += 1
+                self._encoder_outputs[key] = outputs
+                while len(self._encoder_outputs) > DESCRIPTION_CACHE_SIZE:
+                    self._encoder_outputs.popitem(last=False)
+            return outputs
+
+        encoder.forward = cached_forward
+
+    def _inference_context(self):
+        """Grad-free (and for bf16, autocast) context for model.generate"""
+        stack = contextlib.ExitStack()
+        if self.profile != 'default':
+            stack.enter_context(self._torch.inference_mode())
+        if self.profile == 'bf16':
+            stack.enter_context(self._torch.autocast('cpu', dtype=self._torch.bfloat16))
+        return stack
+
+    def _description_inputs(self, description, batch_size=1):
+        """Tokenized description, repeated for a batch, from the per-string LRU"""
+        inputs = self._description_tokens.get(description)
+        if inputs is None:
+            inputs = self.description_tokenizer(description, return_tensors="pt").to(self.device)
+            self._description_tokens[description] = inputs
+            while len(self._description_tokens) > DESCRIPTION_CACHE_SIZE:
+                self._description_tokens.popitem(last=False)
+        else:
+            self._description_tokens.move_to_end(description)
+        if batch_size == 1:
+            return inputs.input_ids, inputs.attention_mask
+        return inputs.input_ids.repeat(batch_size, 1), inputs.attention_mask.repeat(batch_size, 1)
+
+    def _timed_generate(self, description, batch_size, tokenize_prompt, **generate_kwargs):
+        """Run model.generate and record a per-stage timing breakdown"""
+        timings = {}
+        start = time.perf_counter()
+        input_ids, attention_mask = self._description_inputs(description, batch_size)
+        timings['tokenize_description'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        prompt_inputs = tokenize_prompt().to(self.device)
+        timings['tokenize_prompt'] = time.perf_counter() - start
+
+        self._encode_seconds = 0.0
+        start = time.perf_counter()
+        with self._inference_context():
+            generation = self.model.generate(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                prompt_input_ids=prompt_inputs.input_ids,
+                prompt_attention_mask=prompt_inputs.attention_mask,
+                **generate_kwargs
+            )
+        elapsed = time.perf_counter() - start
+        timings['encode_description'] = self._encode_seconds
+        timings['decode'] = elapsed - self._encode_seconds
+
+        for stage, seconds in timings.items():
+            self.stage_seconds[stage] += seconds
+        self.last_timings = {stage: round(seconds, 4) for stage, seconds in timings.items()}
+        return generation
+
+    def _generate(self, prompt, description):
+        generation = self._timed_generate(
+            description, 1, lambda: self.tokenizer(prompt, return_tensors="pt")
+        )
+        return generation.cpu().float().numpy().squeeze()
+
+    def generate(self, prompt, description=None):
+        """Synthesize ``prompt`` and return ``(float32 samples, sampling_rate)``"""
+        with self._lock:
+            start = time.perf_counter()
+            audio_arr = self._generate(prompt, description or DEFAULT_DESCRIPTION)
+            elapsed = time.perf_counter() - start
+            if self.first_inference_seconds is None:
+                self.first_inference_seconds = elapsed
+            self.generations += 1
+            self.total_inference_seconds += elapsed
+        return audio_arr, self.sampling_rate
+
+    def _generate_bucket(self, prompts, description):
+        generation = self._timed_generate(
+            description, len(prompts),
+            lambda: self.tokenizer(prompts, return_tensors="pt", padding=True),
+            return_dict_in_generate=True
+        )
+        sequences = generation.sequences.cpu().float().numpy()
+        # Outputs are padded to the longest item; trim each to its own audio length
+        return [sequences[i, :int(length)] for i, length in enumerate(generation.audios_length)]
+
+    def generate_batch(self, prompts, description=None, max_batch_size=8, max_length_ratio=1.5):
+        """Synthesize many prompts sharing one description.
+
+        Prompts are sorted by token length and grouped into buckets of at most
+        ``max_batch_size`` whose longest prompt is no more than
+        ``max_length_ratio`` times the shortest, which limits padding. Each
+        bucket is a single ``model.generate`` call. Returns a list of float32
+        sample arrays in the input order, and the sampling rate.
+        """
+        description = description or DEFAULT_DESCRIPTION
+        lengths = [len(ids) for ids in self.tokenizer(list(prompts)).input_ids]
+        order = sorted(range(len(prompts)), key=lambda i: lengths[i])
+
+        buckets = []
+        for i in order:
+            bucket = buckets[-1] if buckets else None
+            if (bucket is None or len(bucket) >= max_batch_size
+                    or lengths[i] > max_length_ratio * max(1, lengths[bucket[0]])):
+                buckets.append([i])
+            else:
+                bucket.append(i)
+
+        results = [None] * len(prompts)
+        with self._lock:
+            for bucket in buckets:
+                start = time.perf_counter()
+                audios = self._generate_bucket([prompts[i] for i in bucket], description)
+                elapsed = time.perf_counter() - start
+                if self.first_inference_seconds is None:
+                    self.first_inference_seconds = elapsed
+                self.generations += len(bucket)
+                self.total_inference_seconds += elapsed
+                for i, audio_arr in zip(bucket, audios):
+                    results[i] = audio_arr
+        return results, self.sampling_rate
+
+    def warmup(self):
+        """Run one throwaway generation so the first real request is not the slow one"""
+        with self._lock:
+            start = time.perf_counter()
+            self._generate(WARMUP_PROMPT, DEFAULT_DESCRIPTION)
+            self.warmup_seconds = time.perf_counter() - start
+
+    def stats(self):
+        return {
+            'device': self.device,
+            'profile': self.profile,
+            'threads': self._torch.get_num_threads(),
+            'interop_threads': self._torch.get_num_interop_threads(),
+            'load_seconds': round(self.load_seconds, 3),
+            'warmup_seconds': None if self.warmup_seconds is None else round(self.warmup_seconds, 3),
+            'first_inference_seconds': (
+                None if self.first_inference_seconds is None else round(self.first_inference_seconds, 3)
+            ),
+            'generations': self.generations,
+            'mean_inference_seconds': (
+                round(self.total_inference_seconds / self.generations, 3) if self.generations else None
+            ),
+            'description_cache': {
+                'hits': self.description_cache_hits,
+                'misses': self.description_cache_misses,
+            },
+            'stage_seconds': {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()},
+            'last_timings': self.last_timings,
+        }
+
+
+# Loaded models by (model name, profile they run)
+_MODELS = {}
+# Loads in progress, as futures other callers for the same model wait on
+_LOADING = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_model(model_name=HF_TTS_MODEL, warmup=True, profile=PARLER_PROFILE):
+    """Return the process-wide model for ``model_name`` and ``profile``, loading and warming it once.
+
+    Models are kept per effective profile, so asking for a second profile
+    never returns the first one's model, and a profile that falls back to
+    fp32 shares the fp32 model. The load runs outside the registry lock, so
+    registry_stats() answers while it is in progress; other callers for the
+    same model wait for it.
+    """
+    key = (model_name, effective_profile(profile))
+    with _REGISTRY_LOCK:
+        model = _MODELS.get(key)
+        if model is not None:
+            return model
+        loading = _LOADING.get(key)
+        if loading is None:
+            loading = _LOADING[key] = Future()
+            owner = True
+        else:
+            owner = False
+    if not owner:
+        return loading.result()
+
+    try:
+        print(f"Loading {model_name} ({profile} profile)...")
+        model = ParlerModel(model_name, profile=profile)
+        if warmup:
+            model.warmup()
+    except BaseException as e:
+        with _REGISTRY_LOCK:
+            del _LOADING[key]
+        # Waiters see the same error; the next call tries again
+        loading.set_exception(e)
+        raise
+    with _REGISTRY_LOCK:
+        _MODELS[key] = model
+        del _LOADING[key]
+    loading.set_result(model)
+    print(f"Loaded {model_name} in {model.load_seconds:.1f}s "
+          f"(warmup {model.warmup_seconds or 0:.1f}s) on {model.device}")
+    return model
+
+
+def registry_stats():
+    """Load and latency figures for every loaded model, by ``<model>:<profile>``, for /health"""
+    with _REGISTRY_LOCK:
+        models = dict(_MODELS)
+    return {f"{name}:{profile}": model.stats() for (name, profile), model in models.items()}
@@ -0,0 +1,44 @@
+import os
+import uuid
+
+import numpy as np
+
+# Samples handed to the encoder per block when reading the spool back
+DEFAULT_BLOCK_SAMPLES = 1 << 20
+
+
+class PcmSpool:
+    """Append-only float32 mono PCM file that holds a long render on disk.
+
+    Finished chunks are appended as they complete and read back through a
+    memory map in fixed-size blocks, so the audio of a whole document never
+    has to fit in memory at once.
+    """
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, f"{uuid.uuid4().hex}.spool.f32")
+        self._file = open(self.path, 'wb')
+        self.samples = 0
+
+    def append(self, samples):
+        samples = np.asarray(samples, dtype=np.float32)
+        self._file.write(samples.tobytes())
+        self.samples += len(samples)
+
+    def blocks(self, block_samples=DEFAULT_BLOCK_SAMPLES):
+        """Yield the spooled audio in order as float32 arrays of at most ``block_samples``"""
+        self._file.flush()
+        if not self.samples:
+            return
+        data = np.memmap(self.path, dtype=np.float32, mode='r', shape=(self.samples,))
+        for start in range(0, self.samples, block_samples):
+            yield np.array(data[start:start + block_samples])
+        del data
+
+    def close(self):
+        """Close and delete the spool file"""
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,85 @@
+import re
+
+# Tamil Unicode block; Tamil script can only be read by a Tamil voice
+_TAMIL_RE = re.compile(r'[\u0B80-\u0BFF]')
+# A segment with no letters or digits is punctuation only
+_WORD_CHAR_RE = re.compile(r'\w')
+
+DEFAULT_POLICY = {
+    'enabled': True,
+    # Fold punctuation-only segments into the neighbouring segment
+    'absorb_punctuation': True,
+    # Relabel runs of at most this many words surrounded by the other language
+    'island_max_words': 1,
+    # Cost model used to report the estimated saving: fixed round trip + per character
+    'request_overhead_ms': 350,
+    'per_char_ms': 4,
+}
+
+
+def _can_voice(text, lang):
+    """English voices cannot read Tamil script; Tamil voices read Latin fine"""
+    return lang == 'ta' or not _TAMIL_RE.search(text)
+
+
+def estimate_cost_ms(segments, policy=DEFAULT_POLICY):
+    """Estimated synthesis time if each segment is one sequential engine request"""
+    chars = sum(len(text) for text, _ in segments)
+    return len(segments) * policy['request_overhead_ms'] + chars * policy['per_char_ms']
+
+
+def plan_segments(segments, policy=DEFAULT_POLICY, max_chars=None):
+    """Merge (text, lang) fragments into fewer, larger engine requests.
+
+    Returns ``(planned_segments, stats)``. Punctuation-only fragments are
+    folded into a neighbour, short single-language islands take the
+    language of the run around them when that voice can read them, and
+    neighbouring fragments of the same language are packed up to
+    ``max_chars`` characters per request, the engine's declared
+    ``max_request_chars``.
+    """
+    stats = {
+        'segments_in': len(segments),
+        'punctuation_absorbed': 0,
+        'islands_absorbed': 0,
+    }
+    items = [[text, lang] for text, lang in segments if text.strip()]
+
+    if policy.get('absorb_punctuation', True):
+        merged = []
+        for text, lang in items:
+            if not _WORD_CHAR_RE.search(text) and merged:
+                merged[-1][0] += ' ' + text
+                stats['punctuation_absorbed'] += 1
+            elif merged and not _WORD_CHAR_RE.search(merged[-1][0]):
+                # Leading punctuation joins the first real fragment
+                merged[-1] = [merged[-1][0] + ' ' + text, lang]
+                stats['punctuation_absorbed'] += 1
+            else:
+                merged.append([text, lang])
+        items = merged
+
+    island_max_words = policy.get('island_max_words', 0)
+    if island_max_words:
+        for i in range(1, len(items) - 1):
+            text, lang = items[i]
+            outer = items[i - 1][1]
+            if (outer != lang and items[i + 1][1] == outer
+                    and len(text.split()) <= island_max_words
+                    and _can_voice(text, outer)):
+                items[i][1] = outer
+                stats['islands_absorbed'] += 1
+
+    planned = []
+    for text, lang in items:
+        if planned and planned[-1][1] == lang and (
+                max_chars is None or len(planned[-1][0]) + 1 + len(text) <= max_chars):
+            planned[-1][0] += ' ' + text
+        else:
+            planned.append([text, lang])
+
+    planned = [(text, lang) for text, lang in planned]
+    stats['segments_out'] = len(planned)
+    stats['estimated_cost_ms_before'] = estimate_cost_ms(segments, policy)
+    stats['estimated_cost_ms_after'] = estimate_cost_ms(planned, policy)
+    return planned, stats
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import queue
+import threading
+
+
+class AsyncSubscription:
+    """A subscriber queue that lives on an event loop, fed from any thread.
+
+    Lets an ASGI server wait for updates with ``await get()`` instead of
+    blocking a worker thread on a ``queue.Queue``.
+    """
+
+    def __init__(self, loop, max_pending):
+        self.loop = loop
+        self._queue = asyncio.Queue(maxsize=max_pending)
+
+    async def get(self):
+        return await self._queue.get()
+
+    def put(self, snapshot):
+        try:
+            self.loop.call_soon_threadsafe(self._put, snapshot)
+        except RuntimeError:
+            pass  # The subscriber's loop has closed
+
+    def _put(self, snapshot):
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(snapshot)
+
+
+class ProgressBroker:
+    """Fan-out of job progress snapshots to Server-Sent Events subscribers.
+
+    Each subscriber gets its own small queue: a ``queue.Queue`` from
+    ``subscribe`` or an AsyncSubscription from ``subscribe_async``.
+    Snapshots carry the full job state, so when a slow client falls behind
+    the oldest snapshot is dropped rather than blocking the job that
+    publishes.
+    """
+
+    def __init__(self, max_pending=16):
+        self.max_pending = max_pending
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, job_id):
+        q = queue.Queue(maxsize=self.max_pending)
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(q)
+        return q
+
+    def subscribe_async(self, job_id):
+        """Subscribe from a coroutine; updates arrive on the running event loop"""
+        subscription = AsyncSubscription(asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, job_id, q):
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            if q in subscribers:
+                subscribers.remove(q)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def publish(self, job_id, snapshot):
+        with self._lock:
+            subscribers = list(self._subscribers.get(job_id, ()))
+        for q in subscribers:
+            if isinstance(q, AsyncSubscription):
+                q.put(snapshot)
+                continue
+            while True:
+                try:
+                    q.put_nowait(snapshot)
+                    break
+                except queue.Full:
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+def format_sse(data, event=None):
+    """Encode one Server-Sent Events message"""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
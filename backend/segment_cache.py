@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+
+# Default location and size cap for the on-disk segment cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'mixed_tts', 'segments')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Finished whole-document outputs live in a separate cache of the same kind
+DEFAULT_RESULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'mixed_tts', 'results')
+# Rendered paragraph PCM, reused when an edited document is converted again
+DEFAULT_PARAGRAPH_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'mixed_tts', 'paragraphs')
+
+
+def normalize_text(text):
+    """Normalize text so trivially different inputs share a cache entry"""
+    text = unicodedata.normalize('NFC', text)
+    return ' '.join(text.split())
+
+
+def make_key(text, lang, engine, voice=None, rate=None):
+    """Build a content-addressed key for a synthesized segment"""
+    parts = [normalize_text(text), lang, engine, voice or '', rate or '']
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def make_result_key(paragraphs, settings):
+    """Build a content-addressed key for a whole document rendered with ``settings``.
+
+    ``paragraphs`` is any iterable of strings, so a long document is hashed
+    without joining it; the key is the same however the text is split.
+    """
+    digest = hashlib.sha256()
+    separator = b''
+    for paragraph in paragraphs:
+        normalized = normalize_text(paragraph)
+        if normalized:
+            digest.update(separator + normalized.encode('utf-8'))
+            separator = b' '
+    digest.update(b'\x1f' + json.dumps(settings, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SegmentCache:
+    """On-disk LRU cache of encoded segment audio keyed by content hash.
+
+    Entries are stored as ``<key>.<format>`` files so the encoded bytes can be
+    decoded without re-synthesizing. The total size is capped and the least
+    recently used entries are evicted first.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (filename, size), oldest first
+        self._total_bytes = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU order from the files already on disk"""
+        found = []
+        for name in os.listdir(self.cache_dir):
+            key, _, fmt = name.partition('.')
+            # Skip half-written temp files (tmpXXXX.tmp) left by an interrupted put
+            if not fmt or name.endswith('.tmp'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            found.append((st.st_mtime, key, name, st.st_size))
+        for _, key, name, size in sorted(found):
+            self._entries[key] = (name, size)
+            self._total_bytes += size
+        self._evict()
+
+    def get(self, key):
+        """Return ``(data, format)`` for a cached segment or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            name, _ = entry
+        # Read outside the lock so lookups do not queue behind each other's disk I/O
+        path = os.path.join(self.cache_dir, name)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                # Evicted or replaced meanwhile; only drop the entry if it is still this file
+                if self._entries.get(key, (None,))[0] == name:
+                    self._drop(key)
+                self.misses += 1
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        return data, name.partition('.')[2]
+
+    def path(self, key):
+        """Return ``(path, format)`` of a cached entry without reading it, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            name, _ = entry
+            path = os.path.join(self.cache_dir, name)
+            try:
+                os.utime(path)
+            except OSError:
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return path, name.partition('.')[2]
+
+    def put_file(self, key, path, fmt):
+        """Store an encoded file by copying it in blocks, for outputs too large to read whole"""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if not size or size > self.max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as dst, open(path, 'rb') as src:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, os.path.join(self.cache_dir, f"{key}.{fmt}"))
+        except OSError as e:
+            print(f"Segment cache write error: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        self._add(key, f"{key}.{fmt}", size)
+
+    def put(self, key, data, fmt):
+        """Store encoded segment bytes and evict old entries over the cap"""
+        if not data or len(data) > self.max_bytes:
+            return
+        name = f"{key}.{fmt}"
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.cache_dir, name))
+        except OSError as e:
+            print(f"Segment cache write error: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        self._add(key, name, len(data))
+
+    def _add(self, key, name, size):
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries[key][1]
+            self._entries[key] = (name, size)
+            self._entries.move_to_end(key)
+            self._total_bytes += size
+            self._evict()
+
+    def _drop(self, key):
+        name, size = self._entries.pop(key)
+        self._total_bytes -= size
+        try:
+            os.unlink(os.path.join(self.cache_dir, name))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def stats(self):
+        """Hit/miss counters and current size, for /health"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
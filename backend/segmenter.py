@@ -0,0 +1,108 @@
+import re
+from functools import lru_cache
+
+from langdetect import detect, LangDetectException
+
+# Common Tamil words written in English (Tanglish)
+TANGLISH_WORDS = {
+    'romba', 'nalla', 'enna', 'epdi', 'enga', 'inga', 'anga', 'ippo', 'appo',
+    'thaan', 'than', 'illa', 'illai', 'iruku', 'irukku', 'iruken', 'irukken',
+    'panna', 'pannunga', 'sollu', 'sollungo', 'vaanga', 'ponga', 'vanga',
+    'aamam', 'aama', 'seri', 'sariya', 'konjam', 'koncham', 'kastam',
+    'bore', 'adikkudhu', 'adikuthu', 'podhu', 'pothum', 'venum', 'vendum',
+    'theriyum', 'therla', 'theriyala', 'puriyala', 'puriyuthu', 'mudiala',
+    'mudiyum', 'mudiyathu', 'paravala', 'parava', 'nandri', 'vanakkam',
+    'poi', 'vaa', 'va', 'pa', 'da', 'di', 'ma', 'ya', 'ya', 'la', 'le',
+    'kku', 'ku', 'thala', 'anna', 'akka', 'amma', 'appa', 'thangachi',
+    'thambi', 'macha', 'machan', 'machaan', 'nanba', 'nanban', 'dei', 'dey',
+    'apdiya', 'apdi', 'ipdiya', 'ipdi', 'yenda', 'yenada', 'yen', 'yaar',
+    'evlo', 'evalavu', 'etna', 'ethana', 'eppadi', 'yepdi', 'yenge', 'enga',
+    'kaasu', 'panam', 'velai', 'vela', 'venum', 'venaam', 'thevai',
+    'saptu', 'sapadu', 'saapdu', 'kudikka', 'kudicha', 'poyiten', 'vandhuten',
+    'solluren', 'keluren', 'parkuren', 'paakuren', 'poren', 'poidren',
+    'super', 'mass', 'thara', 'level', 'mokka', 'jolly', 'cool', 'vera',
+    'ooru', 'oor', 'veedu', 'veetu', 'kadai', 'office', 'school', 'college',
+    'friend', 'friends', 'guys', 'bro', 'bha', 'ji'
+}
+
+# Sentences end in runs of . ! ? plus trailing whitespace; the remainder is a sentence too
+_SENTENCE_RE = re.compile(r'[^.!?]*[.!?]+\s*|[^.!?]+')
+# Tamil Unicode block
+_TAMIL_RE = re.compile(r'[\u0B80-\u0BFF]')
+_NON_WORD_RE = re.compile(r'[^\w]')
+# ASCII characters outside \w, removed with a single str.translate call
+_ASCII_NON_WORD = str.maketrans('', '', ''.join(
+    chr(c) for c in range(128) if not (chr(c).isalnum() or chr(c) == '_')
+))
+
+
+@lru_cache(maxsize=65536)
+def classify_word(word):
+    """Return 'ta' or 'en' for a word, or None when its script alone is not decisive.
+
+    Tamil codepoints and known Tanglish words are Tamil, very short words are
+    English, and longer Latin (or other non-Tamil) words are ambiguous.
+    Results are memoized in a bounded LRU.
+    """
+    if word.isascii():
+        if word.lower().translate(_ASCII_NON_WORD) in TANGLISH_WORDS:
+            return 'ta'
+        return 'en' if len(word) < 3 else None
+    if _TAMIL_RE.search(word):
+        return 'ta'
+    if _NON_WORD_RE.sub('', word.lower()) in TANGLISH_WORDS:
+        return 'ta'
+    return 'en' if len(word) < 3 else None
+
+
+@lru_cache(maxsize=4096)
+def detect_latin_run(text):
+    """Resolve an ambiguous non-Tamil run with langdetect (bounded LRU)"""
+    try:
+        return 'ta' if detect(text) == 'ta' else 'en'
+    except LangDetectException:
+        return 'en'
+
+
+def _resolve_ambiguous(words, langs):
+    """Replace each run of ambiguous words with a single langdetect decision"""
+    i = 0
+    while i < len(langs):
+        if langs[i] is not None:
+            i += 1
+            continue
+        j = i
+        while j < len(langs) and langs[j] is None:
+            j += 1
+        langs[i:j] = [detect_latin_run(' '.join(words[i:j]))] * (j - i)
+        i = j
+
+
+def split_mixed_text(text, use_langdetect=False):
+    """Split text into (segment_text, lang) runs of Tamil ('ta') and English ('en').
+
+    Sentences are found with one compiled regex and words are classified by
+    script, so no per-word language detection is needed. Ambiguous runs are
+    English unless ``use_langdetect`` asks langdetect about them. Segments
+    never cross sentence boundaries.
+    """
+    segments = []
+    for match in _SENTENCE_RE.finditer(text):
+        words = match.group().split()
+        if not words:
+            continue
+        langs = list(map(classify_word, words))
+        if None in langs:
+            if use_langdetect:
+                _resolve_ambiguous(words, langs)
+            else:
+                langs = ['en' if lang is None else lang for lang in langs]
+        start = 0
+        current = langs[0]
+        for i in range(1, len(langs)):
+            if langs[i] != current:
+                segments.append((' '.join(words[start:i]), current))
+                start = i
+                current = langs[i]
+        segments.append((' '.join(words[start:]), current))
+    return segments
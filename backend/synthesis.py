@@ -0,0 +1,144 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# Slot wait collected for the current task, when its caller asked for it
+_slot_wait = contextvars.ContextVar('tts_slot_wait', default=None)
+
+
+@contextmanager
+def slot_wait():
+    """Collect the time the enclosed block spends waiting for SynthesisPool slots.
+
+    Yields a dict whose ``seconds`` grows with every wait, so a caller timing
+    an engine call can tell queueing apart from the call itself.
+    """
+    waited = {'seconds': 0.0}
+    token = _slot_wait.set(waited)
+    try:
+        yield waited
+    finally:
+        _slot_wait.reset(token)
+
+
+class SlotLimiter:
+    """Process-wide limit on in-flight calls that tasks on any event loop can await.
+
+    Waiters park as futures on their own loop rather than as threads blocked
+    in ``acquire``, so waiting for a slot never occupies an executor. A
+    released slot is handed straight to the oldest waiter.
+    """
+
+    def __init__(self, limit):
+        self.limit = max(1, int(limit))
+        self._in_use = 0
+        self._waiters = deque()  # (loop, future), oldest first
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._in_use < self.limit and not self._waiters:
+                self._in_use += 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            # Already handed a slot: give it back (a cancelled future does so in _grant)
+            if not queued and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """Free a slot; safe to call from any thread"""
+        with self._lock:
+            if not self._waiters:
+                self._in_use -= 1
+                return
+            loop, future = self._waiters.popleft()
+        loop.call_soon_threadsafe(self._grant, future)
+
+    def _grant(self, future):
+        if future.cancelled():
+            # The waiter gave up after the slot was handed over; pass it on
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class SynthesisPool:
+    """Runs TTS engine calls off the event loop with per-engine concurrency limits.
+
+    Blocking engines (gTTS, Parler) are executed on a shared thread pool so
+    that ``asyncio.gather`` over segments gives real wall-clock overlap.
+    Limits are process-wide SlotLimiters, so they hold across jobs even
+    though each job may run on its own event loop. A call takes its
+    engine's slot before it is dispatched, so work queued for a slow
+    engine waits on the event loop instead of filling the shared pool.
+    """
+
+    def __init__(self, max_workers, limits, default_limit=4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tts-synth')
+        self.default_limit = default_limit
+        self._limits = dict(limits)
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def _limiter(self, engine):
+        with self._lock:
+            limiter = self._limiters.get(engine)
+            if limiter is None:
+                limiter = SlotLimiter(self._limits.get(engine, self.default_limit))
+                self._limiters[engine] = limiter
+            return limiter
+
+    async def _acquire(self, engine):
+        limiter = self._limiter(engine)
+        start = time.perf_counter()
+        await limiter.acquire()
+        waited = _slot_wait.get()
+        if waited is not None:
+            waited['seconds'] += time.perf_counter() - start
+        return limiter
+
+    async def run(self, engine, fn, *args):
+        """Run a blocking engine function in the pool under the engine's limit"""
+        limiter = await self._acquire(engine)
+        # Carry context variables (e.g. the job being timed) into the worker thread
+        ctx = contextvars.copy_context()
+        try:
+            future = self.executor.submit(ctx.run, fn, *args)
+        except BaseException:
+            limiter.release()
+            raise
+        # Freed when the call ends, even if the awaiting task was cancelled (e.g. a lost hedge)
+        future.add_done_callback(lambda _: limiter.release())
+        return await asyncio.wrap_future(future)
+
+    async def run_async(self, engine, coro_fn, *args):
+        """Await an async engine coroutine under the engine's limit"""
+        limiter = await self._acquire(engine)
+        try:
+            return await coro_fn(*args)
+        finally:
+            limiter.release()
+
+    def set_limit(self, engine, limit):
+        """Set an engine's in-flight limit; call before the engine's first request"""
+        with self._lock:
+            self._limits[engine] = limit
+            self._limiters.pop(engine, None)
+
+    def limits(self):
+        """Configured per-engine concurrency limits"""
+        return dict(self._limits)
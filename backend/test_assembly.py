@@ -0,0 +1,26 @@
+import numpy as np
+
+from assembly import CANONICAL_RATE, speed_up
+
+
+def _clip(seconds):
+    t = np.arange(int(CANONICAL_RATE * seconds)) / CANONICAL_RATE
+    return (0.2 * np.sin(2 * np.pi * 180 * t)).astype(np.float32)
+
+
+def test_speed_up_shortens_by_playback_speed():
+    # pydub keeps a little extra audio around each crossfade
+    faster = speed_up(_clip(2.0), CANONICAL_RATE, 1.25)
+    assert 2.0 / 1.25 <= len(faster) / CANONICAL_RATE < 2.0 / 1.25 * 1.05
+
+
+def test_speed_up_returns_one_word_clip_unchanged():
+    # 0.14 s, what a one-word paragraph such as "Hi" renders to
+    clip = _clip(0.14)
+    assert np.array_equal(speed_up(clip, CANONICAL_RATE, 1.25), clip)
+
+
+def test_speed_up_accepts_every_length_around_the_window():
+    for speed in (1.25, 1.5, 2.5):
+        for ms in range(150, 260, 3):
+            speed_up(_clip(ms / 1000), CANONICAL_RATE, speed)
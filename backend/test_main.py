@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import main
+
+
+def test_one_word_paragraph_converts():
+    output_path, failed = asyncio.run(main.process_text_to_speech('Hi\n\nHello there, how are you today?'))
+    assert failed == 0
+    with open(main.manifest_path(output_path), encoding='utf-8') as f:
+        paragraphs = [p for p in json.load(f)['paragraphs'] if p['hash']]
+    assert [p['preview'] for p in paragraphs] == ['Hi', 'Hello there, how are you today?']
+    assert paragraphs[0]['end_sample'] > paragraphs[0]['start_sample']
+
+
+def test_convert_one_word_text():
+    response = main.app.test_client().post('/convert', data={'text': 'Hi', 'format': 'wav'})
+    assert response.status_code == 200
+    assert response.data[:4] == b'RIFF'
+
+
+def test_download_of_job_with_failed_segment_has_no_etag(monkeypatch):
+    async def failing(text):
+        raise RuntimeError('engine down')
+    monkeypatch.setattr(main, 'generate_english_audio', failing)
+    source = main.DocumentSource(text='Engine outage during this job.')
+    job_id = 'failed-segment-job'
+    main._init_job(job_id, 'wav', main.result_key(source, 'wav'))
+    asyncio.run(main._run_conversion_job(job_id, source, 'wav'))
+    assert main.JOBS[job_id]['failed_paragraphs'] == 1
+
+    response = main.app.test_client().get(f'/download/{job_id}')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+
+def test_stream_one_word_segments():
+    # Language switches leave one-word segments to speed up and encode on their own
+    text = 'Hi வணக்கம் friend'
+    response = main.app.test_client().post('/convert_stream', data={'text': text, 'format': 'pcm'})
+    assert response.status_code == 200
+    # s16le has no registered audio type; audio/L16 would mean big-endian
+    assert response.mimetype == 'application/octet-stream'
+    streamed = response.get_data()
+    assert streamed
+
+    async def collect():
+        return b''.join([chunk async for chunk in main.astream_text_to_speech(text, 'pcm')])
+    assert asyncio.run(collect()) == streamed
@@ -0,0 +1,59 @@
+import threading
+import time
+
+import parler_registry
+
+
+class SlowModel:
+    """Stands in for ParlerModel: loading takes ``LOAD_SECONDS``"""
+    LOAD_SECONDS = 0.5
+    loads = 0
+
+    def __init__(self, model_name, profile):
+        SlowModel.loads += 1
+        time.sleep(self.LOAD_SECONDS)
+        self.profile = profile
+        self.device = 'cpu'
+        self.load_seconds = self.LOAD_SECONDS
+        self.warmup_seconds = None
+
+    def warmup(self):
+        pass
+
+    def stats(self):
+        return {'profile': self.profile}
+
+
+def test_stats_do_not_wait_for_a_loading_model(monkeypatch):
+    monkeypatch.setattr(parler_registry, 'ParlerModel', SlowModel)
+    monkeypatch.setattr(parler_registry, '_MODELS', {})
+    SlowModel.loads = 0
+    models = []
+    loaders = [threading.Thread(target=lambda: models.append(parler_registry.get_model('slow')))
+               for _ in range(3)]
+    for loader in loaders:
+        loader.start()
+    time.sleep(0.05)
+
+    start = time.perf_counter()
+    assert parler_registry.registry_stats() == {}
+    assert time.perf_counter() - start < 0.1
+
+    for loader in loaders:
+        loader.join()
+    assert SlowModel.loads == 1
+    assert len(models) == 3 and all(model is models[0] for model in models)
+    profile = parler_registry.effective_profile()
+    assert parler_registry.registry_stats() == {f'slow:{profile}': {'profile': parler_registry.PARLER_PROFILE}}
+
+
+def test_each_profile_gets_its_own_model(monkeypatch):
+    monkeypatch.setattr(parler_registry, 'ParlerModel', SlowModel)
+    monkeypatch.setattr(parler_registry, '_MODELS', {})
+    monkeypatch.setattr(SlowModel, 'LOAD_SECONDS', 0)
+    # As on a CPU without bf16: bf16 falls back to fp32
+    monkeypatch.setattr(parler_registry, 'effective_profile', lambda profile: {'bf16': 'fp32'}.get(profile, profile))
+
+    fp32 = parler_registry.get_model('slow', profile='fp32')
+    assert parler_registry.get_model('slow', profile='int8') is not fp32
+    assert parler_registry.get_model('slow', profile='bf16') is fp32
@@ -221,6 +221,11 @@ class TTSConverter {
                 throw new Error(startData.error || 'Failed to start conversion');
             }
             const jobId = startData.job_id;
+            if (startData.cached) {
+                // Same text and settings were converted before: no job, download right away
+                await this.loadResult(jobId, outputSection);
+                return;
+            }
             // Show progress UI
             const progressContainer = document.getElementById('progressContainer');
             const progressFill = document.getElementById('progressFill');
@@ -371,43 +376,91 @@ class TTSConverter {
         const progressText = document.getElementById('progressText');
         const progressFill = document.getElementById('progressFill');
         const progressLabel = document.getElementById('progressLabel');
-        const pollIntervalMs = 1000;
 
+        await this.followJob(jobId, (data) => {
+            if (progressText && data.status === 'queued' && data.queue_position) {
+                progressText.textContent = `Queued (#${data.queue_position}, ~${Math.ceil(data.estimated_wait_seconds)}s)`;
+            } else if (progressText && typeof data.percent === 'number') {
+                progressText.textContent = `Processing... ${data.percent}%`;
+            }
+            if (progressFill && typeof data.percent === 'number') {
+                progressFill.style.width = `${data.percent}%`;
+            }
+            if (progressLabel && typeof data.percent === 'number') {
+                progressLabel.textContent = `${data.percent}%`;
+            }
+        });
+
+        await this.loadResult(jobId, outputSection);
+    }
+
+    // Fetch a finished job (or cached result) and load it into the player
+    async loadResult(jobId, outputSection) {
+        const audioRes = await fetch(`http://localhost:5000/download/${jobId}`);
+        if (!audioRes.ok) {
+            const err = await audioRes.json().catch(() => ({}));
+            throw new Error(err.error || 'Failed to download audio');
+        }
+        const audioBlob = await audioRes.blob();
+        this.currentAudioUrl = URL.createObjectURL(audioBlob);
+        const audioPlayer = document.getElementById('audioPlayer');
+        audioPlayer.src = this.currentAudioUrl;
+        outputSection.style.display = 'block';
+        // Optionally hide progress a moment after completion
+        setTimeout(() => {
+            const progressContainer = document.getElementById('progressContainer');
+            if (progressContainer) progressContainer.style.display = 'none';
+        }, 1200);
+    }
+
+    // Follow a job until it finishes: pushed updates over SSE, polling if that is unavailable
+    followJob(jobId, onUpdate = () => {}) {
+        if (typeof EventSource === 'undefined') {
+            return this.pollJob(jobId, onUpdate);
+        }
+        return new Promise((resolve, reject) => {
+            const source = new EventSource(`http://localhost:5000/progress/${jobId}/events`);
+            source.onmessage = (event) => {
+                const data = JSON.parse(event.data);
+                onUpdate(data);
+                if (data.status === 'finished') {
+                    source.close();
+                    resolve(data);
+                } else if (data.status === 'error') {
+                    source.close();
+                    reject(new Error(data.error || 'Conversion failed'));
+                }
+            };
+            source.addEventListener('error', (event) => {
+                source.close();
+                if (event.data) {
+                    // Server-sent error event, e.g. the job expired
+                    reject(new Error(JSON.parse(event.data).error || 'Conversion failed'));
+                } else {
+                    console.warn('Progress events unavailable, polling instead');
+                    this.pollJob(jobId, onUpdate).then(resolve, reject);
+                }
+            });
+        });
+    }
+
+    pollJob(jobId, onUpdate = () => {}, pollIntervalMs = 1000) {
         return new Promise((resolve, reject) => {
             const timer = setInterval(async () => {
                 try {
                     const res = await fetch(`http://localhost:5000/progress/${jobId}`);
                     const data = await res.json();
-
-                    if (progressText && typeof data.percent === 'number') {
-                        progressText.textContent = `Processing... ${data.percent}%`;
-                    }
-                    if (progressFill && typeof data.percent === 'number') {
-                        progressFill.style.width = `${data.percent}%`;
-                    }
-                    if (progressLabel && typeof data.percent === 'number') {
-                        progressLabel.textContent = `${data.percent}%`;
+                    if (!res.ok) {
+                        // e.g. the job expired or never existed: stop polling
+                        clearInterval(timer);
+                        reject(new Error(data.error || 'Failed to get progress'));
+                        return;
                     }
+                    onUpdate(data);
 
                     if (data.status === 'finished') {
                         clearInterval(timer);
-                        // Fetch final audio
-                        const audioRes = await fetch(`http://localhost:5000/download/${jobId}`);
-                        if (!audioRes.ok) {
-                            const err = await audioRes.json().catch(() => ({}));
-                            throw new Error(err.error || 'Failed to download audio');
-                        }
-                        const audioBlob = await audioRes.blob();
-                        this.currentAudioUrl = URL.createObjectURL(audioBlob);
-                        const audioPlayer = document.getElementById('audioPlayer');
-                        audioPlayer.src = this.currentAudioUrl;
-                        outputSection.style.display = 'block';
-                        // Optionally hide progress a moment after completion
-                        setTimeout(() => {
-                            const progressContainer = document.getElementById('progressContainer');
-                            if (progressContainer) progressContainer.style.display = 'none';
-                        }, 1200);
-                        resolve();
+                        resolve(data);
                     } else if (data.status === 'error') {
                         clearInterval(timer);
                         reject(new Error(data.error || 'Conversion failed'));
@@ -641,6 +694,14 @@ class TTSConverter {
         speakBtn.textContent = '🔄 Converting...';
 
         try {
+            try {
+                // Stream audio so playback starts as soon as the first segment is ready
+                await this.playStream(this.lastAssistantResponse);
+                return;
+            } catch (streamError) {
+                console.warn('Streaming TTS failed, falling back to async job:', streamError);
+            }
+
             const formData = new FormData();
             formData.append('text', this.lastAssistantResponse);
 
@@ -656,8 +717,10 @@ class TTSConverter {
 
             const jobId = startData.job_id;
 
-            // Poll for completion
-            await this.waitForJobCompletion(jobId);
+            // A cached result has no job to wait for; its key downloads directly
+            if (!startData.cached) {
+                await this.waitForJobCompletion(jobId);
+            }
 
             // Fetch and play audio
             const audioRes = await fetch(`http://localhost:5000/download/${jobId}`);
@@ -679,26 +742,50 @@ class TTSConverter {
         }
     }
 
-    async waitForJobCompletion(jobId) {
-        return new Promise((resolve, reject) => {
-            const timer = setInterval(async () => {
-                try {
-                    const res = await fetch(`http://localhost:5000/progress/${jobId}`);
-                    const data = await res.json();
+    async playStream(text) {
+        const formData = new FormData();
+        formData.append('text', text);
 
-                    if (data.status === 'finished') {
-                        clearInterval(timer);
-                        resolve();
-                    } else if (data.status === 'error') {
-                        clearInterval(timer);
-                        reject(new Error(data.error || 'Conversion failed'));
-                    }
-                } catch (err) {
-                    clearInterval(timer);
-                    reject(err);
-                }
-            }, 500);
+        const res = await fetch('http://localhost:5000/convert_stream', {
+            method: 'POST',
+            body: formData
         });
+        if (!res.ok) {
+            const err = await res.json().catch(() => ({}));
+            throw new Error(err.error || 'Streaming conversion failed');
+        }
+
+        const audio = new Audio();
+        if (!res.body || !window.MediaSource || !MediaSource.isTypeSupported('audio/mpeg')) {
+            // No Media Source support: play once the whole response has arrived
+            audio.src = URL.createObjectURL(await res.blob());
+            await audio.play();
+            return;
+        }
+
+        const mediaSource = new MediaSource();
+        audio.src = URL.createObjectURL(mediaSource);
+        await new Promise(resolve => mediaSource.addEventListener('sourceopen', resolve, { once: true }));
+        const sourceBuffer = mediaSource.addSourceBuffer('audio/mpeg');
+        sourceBuffer.mode = 'sequence';
+
+        const reader = res.body.getReader();
+        let started = false;
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            sourceBuffer.appendBuffer(value);
+            await new Promise(resolve => sourceBuffer.addEventListener('updateend', resolve, { once: true }));
+            if (!started) {
+                started = true;
+                audio.play().catch(err => console.warn('Autoplay blocked:', err));
+            }
+        }
+        mediaSource.endOfStream();
+    }
+
+    async waitForJobCompletion(jobId) {
+        return this.followJob(jobId);
     }
 }
 
@@ -21,16 +21,23 @@ else
     pip install -r requirements.txt
 fi
 
+# TTS_SERVER=asgi serves the same API from Starlette/uvicorn on one event loop
+if [ "$TTS_SERVER" = "asgi" ]; then
+    SERVER_SCRIPT=backend/asgi.py
+else
+    SERVER_SCRIPT=backend/main.py
+fi
+
 # Check if server is already running
 if lsof -Pi :5000 -sTCP:LISTEN -t >/dev/null ; then
     echo "⚠️  Server already running on port 5000"
-    echo "To stop it: pkill -f 'python backend/main.py'"
+    echo "To stop it: ./stop.sh"
     echo ""
 else
     # Start the backend server
     echo "✓ Activating virtual environment..."
-    echo "✓ Starting Flask backend on http://127.0.0.1:5000..."
-    python backend/main.py &
+    echo "✓ Starting backend ($SERVER_SCRIPT) on http://127.0.0.1:5000..."
+    python $SERVER_SCRIPT &
     SERVER_PID=$!
     
     # Wait for server to start
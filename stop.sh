@@ -3,7 +3,7 @@
 
 echo "🛑 Stopping Mixed TTS Server..."
 
-pkill -f "python backend/main.py"
+pkill -f "python backend/(main|asgi).py"
 
 if [ $? -eq 0 ]; then
     echo "✓ Server stopped successfully"